@@ -1,8 +1,13 @@
-
 import gc
 
 from drivers import color565
 from extensions import input
+from utils.lazy_registry import LazyRegistry, unload_modules
+
+# app packages are imported when started and unloaded when they return
+APPS = LazyRegistry([
+    ['pico-spacegame', 'apps.pico_spacegame.spacegame'],
+])
 
 
 class AppLauncher(object):
@@ -31,7 +36,9 @@ class AppLauncher(object):
             gc.collect()
 
     def _run_pico_spacegame(self):
-        from apps.pico_spacegame.spacegame import SpaceGame
-        self.display.set_brightness(0xCFFF)
-        self.display.fill(color565(0x15, 0xb0, 0x1a))
-        SpaceGame(self.display, self.touch).run()
+        try:
+            self.display.set_brightness(0xCFFF)
+            self.display.fill(color565(0x15, 0xb0, 0x1a))
+            APPS['pico-spacegame'].SpaceGame(self.display, self.touch).run()
+        finally:
+            unload_modules('apps.pico_spacegame')
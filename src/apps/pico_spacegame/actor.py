@@ -1,3 +1,7 @@
+import framebuf
+from extensions import fb
+
+
 class Actor:
 
     def __init__(self, fbuf, filename, position=(0, 0)):
@@ -14,6 +18,7 @@ class Actor:
         # private member - when changed reload image
         self._image = filename
         self.image_data = self.load_image()
+        self._sprite = None
 
     # Image property can be used to change the image
     # if use <instance>.image = newfile then it will load that file instead
@@ -25,6 +30,7 @@ class Actor:
     def image(self, new_value):
         self._image = new_value
         self.image_data = self.load_image()
+        self._sprite = None
 
     # rotation angle can be set in degrees
     # Only actual rotate in 90 deg intervals
@@ -41,6 +47,8 @@ class Actor:
             new_value -= 360
         if (new_value <= -360):
             new_value += 360
+        if self.get_rotate_quadrant(new_value) != self.get_rotate_quadrant(self._angle):
+            self._sprite = None
         self._angle = new_value
 
     def load_image(self):
@@ -69,22 +77,42 @@ class Actor:
         # this gives top left hand corner of image
         topleft_x = self.x - int(self.get_rotate_width()/2)
         topleft_y = self.y - int(self.get_rotate_height()/2)
-        for y in range(0, self.get_rotate_height()):
-            # Check y is in range
-            if (topleft_y + y < 0 or topleft_y + y >= self.fbuf.height):
-                continue
-            # buffer pos of actor
-            actor_start_row = self.sprite_buffer_pos(0, y)
-            for x in range(0, self.get_rotate_width()):
-                # Check x is in range
-                if (topleft_x + x < 0 or topleft_x + x >= self.fbuf.width):
-                    continue
-                color_bytes = self.get_sprite_data(x, y)
-                # If transparent then don't copy
-                if (self.enable_transparency and color_bytes[0] == 0 and color_bytes[1] == 0):
-                    continue
-                # Draw the pixel on the framebuffer
-                self.fbuf.pixel(topleft_x+x, topleft_y+y, int.from_bytes(color_bytes, 'big'))
+        # black is the transparency key, clipping is done by the framebuffer
+        key = 0 if self.enable_transparency else -1
+        self.fbuf.blit(self.get_sprite(), topleft_x, topleft_y, key, framebuf.RGB565)
+
+    # bounding box (x, y, w, h) of the image as drawn by draw()
+    def bounds(self):
+        rotate_width = self.get_rotate_width()
+        rotate_height = self.get_rotate_height()
+        return (self.x - int(rotate_width/2), self.y - int(rotate_height/2), rotate_width, rotate_height)
+
+    def get_sprite(self):
+        # (re)build the sprite framebuffer only when image or rotation changed
+        if self._sprite is None:
+            if self.get_rotate_quadrant(self._angle) == 0:
+                sprite_data = self.image_data
+            else:
+                sprite_data = bytearray(len(self.image_data))
+                rotate_width = self.get_rotate_width()
+                for y in range(0, self.get_rotate_height()):
+                    for x in range(0, rotate_width):
+                        pos = (y*rotate_width*2) + (x*2)
+                        sprite_data[pos:pos+2] = self.get_sprite_data(x, y)
+            self._sprite = fb.FrameBufferEx(sprite_data, self.get_rotate_width(), self.get_rotate_height(),
+                                            framebuf.RGB565)
+        return self._sprite
+
+    # return 0, 90, -90 or 180 depending on which rotation is applied for the angle
+    @staticmethod
+    def get_rotate_quadrant(angle):
+        if ((angle > 45 and angle <= 135) or (angle < -225 and angle >= -315)):
+            return 90
+        if ((angle < -45 and angle >= -135) or (angle > 225 and angle <= 315)):
+            return -90
+        if ((angle > 135 and angle <= 225) or (angle < -135 and angle >= -225)):
+            return 180
+        return 0
 
     def get_sprite_data(self, x, y):
         color_bytes = bytearray(2)
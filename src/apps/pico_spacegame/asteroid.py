@@ -1,43 +1,41 @@
-import utime
 from apps.pico_spacegame.constants import *
 
 
 class Asteroid:
+    __slots__ = ('fbuf', 'size', 'x', 'y', 'velocity', 'color', 'status', 'pool_index')
 
-    def __init__(self, fbuf, start_time, image_size, start_pos, velocity, color):
+    def __init__(self, fbuf):
         self.fbuf = fbuf
-        if (image_size == "asteroid_sml"):
-            self.size = 5
-        elif (image_size == "asteroid_med"):
-            self.size = 8
-        else:
-            self.size = 12
-        self.start_pos = start_pos
-        #self.x = start_pos[0]
-        #self.y = start_pos[1]
+        self.size = 12
         # start position is off screen
         self.x = -20
         self.y = -20
-        self.start_time = start_time
+        self.velocity = 0
+        self.color = 0
+        self.status = STATUS_WAITING
+        self.pool_index = 0
+
+    def spawn(self, size, start_pos, velocity, color):
+        self.size = size
+        self.x = start_pos[0]
+        self.y = start_pos[1]
         self.velocity = velocity
         self.color = color
-        self.status = STATUS_WAITING
+        self.status = STATUS_VISIBLE
 
     def draw(self):
         if self.status != STATUS_VISIBLE:
             return
         self.fbuf.fill_circle(int(self.x), int(self.y), self.size, self.color)
 
-    def update(self, level_time):
-        if self.status == STATUS_WAITING:
-            # Check if time reached
-            if (utime.time() > level_time + self.start_time):
-                #print ("Starting new asteroid")
-                # Reset to start position
-                self.x = self.start_pos[0]
-                self.y = self.start_pos[1]
-                self.status = STATUS_VISIBLE
-        elif self.status == STATUS_VISIBLE:
+    # bounding box (x, y, w, h) as drawn by draw(), None if not visible
+    def bounds(self):
+        if self.status != STATUS_VISIBLE:
+            return None
+        return (int(self.x) - self.size, int(self.y) - self.size, 2 * self.size + 1, 2 * self.size + 1)
+
+    def update(self):
+        if self.status == STATUS_VISIBLE:
             self.y += self.velocity
 
     def reset(self):
@@ -4,9 +4,16 @@ import sys
 import utime
 from apps.pico_spacegame.asteroid import Asteroid
 from apps.pico_spacegame.constants import *
+from apps.pico_spacegame.level import Level
+from apps.pico_spacegame.spatialhash import SpatialHash
 from drivers import color565
+from extensions import pool
 
-configfile = "/apps/pico_spacegame/enemies.dat"
+# compiled from enemies.dat with tools/level_compiler.py
+configfile = "/apps/pico_spacegame/enemies.lvl"
+
+# max. number of asteroids on screen at the same time
+MAX_ASTEROIDS = 16
 
 
 class Enemies:
@@ -14,75 +21,92 @@ class Enemies:
     def __init__(self, fbuf):
         self.fbuf = fbuf
         self.enemy_color = color565(150, 75, 0)
-        self.asteroids = []
+        # visible asteroids
+        self.asteroids = pool.EntityPool(lambda: Asteroid(fbuf), MAX_ASTEROIDS)
+        # collision broad-phase for the visible asteroids
+        self.grid = SpatialHash()
         # Time that this level started
-        self.level_time = utime.time()
-        self.level_end = None
+        self.level_time = utime.ticks_ms()
 
         # Load the config file
         try:
             random.seed(self.level_time)
-            with open(configfile, 'r') as file:
-                lines = file.readlines()
-                for line in lines:
-                    enemy_details = line.split(",")
-                    if enemy_details[1] == "end":
-                        self.level_end = int(enemy_details[0])
-                    elif enemy_details[1] == "asteroid":
-                        start_time = int(enemy_details[0])
-                        # value 1 is type
-                        image_size = enemy_details[2]
-                        start_pos = (int(enemy_details[3]), int(enemy_details[4]))
-                        velocity = int(enemy_details[5])
-                        asteroid_color = self.enemy_color + random.randint(0, 100)
-                        self.asteroids.append(Asteroid(fbuf, start_time, image_size, start_pos, velocity,
-                                                       asteroid_color))
-                        #print ("Asteroid {} {} {} {}".format(start_time, image_size, start_pos, velocity))
-        except IOError:
+            self.level = Level(configfile)
+        except OSError:
             print("Error reading configuration file "+configfile)
             # Just end as cannot play without config file
             sys.exit()
         except:
             print("Corrupt configuration file "+configfile)
             sys.exit()
+        self.level_end = self.level.end_ms
 
     def draw(self):
-        for this_asteroid in self.asteroids:
+        asteroids = self.asteroids.items
+        for idx in range(self.asteroids.count - 1, -1, -1):
+            this_asteroid = asteroids[idx]
             this_asteroid.draw()
 
     # Updates positions of all enemies
     def update(self):
         # Check for level end reached
-        if (self.level_end != None and
-                utime.time() > self.level_time + self.level_end):
+        elapsed = utime.ticks_diff(utime.ticks_ms(), self.level_time)
+        if (self.level_end != None and elapsed > self.level_end):
             self.next_level()
+            elapsed = 0
 
-        for this_asteroid in self.asteroids:
-            this_asteroid.update(self.level_time)
+        # Spawn asteroids whose start time was reached
+        while self.level.due(elapsed):
+            this_asteroid = self.asteroids.acquire()
+            if this_asteroid is None:
+                break  # too many on screen, try again next update
+            size, start_pos, velocity = self.level.pop()
+            asteroid_color = self.enemy_color + random.randint(0, 100)
+            this_asteroid.spawn(size, start_pos, velocity, asteroid_color)
 
-    def check_shot(self, shot_x, shot_y):
-        for this_asteroid in self.asteroids:
-            if this_asteroid.status != STATUS_VISIBLE:
+        asteroids = self.asteroids.items
+        for idx in range(self.asteroids.count - 1, -1, -1):
+            this_asteroid = asteroids[idx]
+            this_asteroid.update()
+            # moved out of the bottom of the screen
+            if this_asteroid.y - this_asteroid.size >= self.fbuf.height:
+                this_asteroid.status = STATUS_OFFSCREEN
+                self.grid.remove(this_asteroid)
+                self.asteroids.release(this_asteroid)
                 continue
+            size = this_asteroid.size
+            self.grid.update(this_asteroid,
+                             this_asteroid.x - size, this_asteroid.y - size,
+                             this_asteroid.x + size, this_asteroid.y + size)
+
+    def check_shot(self, shot_x, shot_y):
+        for this_asteroid in self.grid.query(shot_x, shot_y):
             if this_asteroid.collidepoint(shot_x, shot_y):
-                this_asteroid.status = STATUS_DESTROYED
+                self.destroy(this_asteroid)
                 return True
         return False
 
     def check_crash(self, spacecraft_position, hit_points):
-        for this_asteroid in self.asteroids:
-            # skip any that are not visible
-            if this_asteroid.status != STATUS_VISIBLE:
-                continue
-            for this_point in hit_points:
-                if this_asteroid.collidepoint(
-                        spacecraft_position[0]+this_point[0],
-                        spacecraft_position[1]+this_point[1]):
-                    this_asteroid.status = STATUS_DESTROYED
+        for this_point in hit_points:
+            point_x = spacecraft_position[0]+this_point[0]
+            point_y = spacecraft_position[1]+this_point[1]
+            for this_asteroid in self.grid.query(point_x, point_y):
+                if this_asteroid.collidepoint(point_x, point_y):
+                    self.destroy(this_asteroid)
                     return True
         return False
 
+    def destroy(self, this_asteroid):
+        this_asteroid.hit()
+        self.grid.remove(this_asteroid)
+        self.asteroids.release(this_asteroid)
+
     def next_level(self):
-        self.level_time = utime.time()
-        for this_asteroid in self.asteroids:
+        self.level_time = utime.ticks_ms()
+        self.level.restart()
+        self.grid.clear()
+        asteroids = self.asteroids.items
+        for idx in range(self.asteroids.count - 1, -1, -1):
+            this_asteroid = asteroids[idx]
             this_asteroid.reset()
+        self.asteroids.clear()
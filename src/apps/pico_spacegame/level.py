@@ -0,0 +1,54 @@
+import ustruct
+
+# Compiled level format, see tools/level_compiler.py
+MAGIC = b'SGL1'
+HEADER = '<4sHI'  # magic, number of records, level end in ms
+RECORD = '<IBhhb'  # start time in ms, radius, start x, start y, velocity
+HEADER_SIZE = ustruct.calcsize(HEADER)
+RECORD_SIZE = ustruct.calcsize(RECORD)
+NO_END = 0xFFFFFFFF
+
+
+class Level:
+    """Streams the time-sorted spawn records of a compiled level file.
+
+    Only the next due record is held in RAM, spawning costs O(spawns due).
+    """
+
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        magic, self.count, end_ms = ustruct.unpack(HEADER, self.file.read(HEADER_SIZE))
+        if magic != MAGIC:
+            self.file.close()
+            raise ValueError('Not a compiled level file: ' + filename)
+        # level end in ms after level start (None if the level never ends)
+        self.end_ms = None if end_ms == NO_END else end_ms
+        self._record = bytearray(RECORD_SIZE)
+        self.restart()
+
+    def restart(self):
+        """Rewind to the first record."""
+        self.file.seek(HEADER_SIZE)
+        self.index = 0
+        self._read_next()
+
+    def due(self, elapsed_ms):
+        """Return True if the next record starts at or before elapsed_ms."""
+        return self.next_time is not None and self.next_time <= elapsed_ms
+
+    def pop(self):
+        """Return (radius, start_pos, velocity) of the next record and advance."""
+        _, size, x, y, velocity = ustruct.unpack(RECORD, self._record)
+        self._read_next()
+        return size, (x, y), velocity
+
+    def close(self):
+        self.file.close()
+
+    def _read_next(self):
+        # start time of the next record (None when all records were read)
+        if self.index >= self.count or self.file.readinto(self._record) != RECORD_SIZE:
+            self.next_time = None
+            return
+        self.index += 1
+        self.next_time = ustruct.unpack_from('<I', self._record)[0]
@@ -4,16 +4,28 @@ from drivers import color565
 
 
 class Shot:
+    __slots__ = ('fbuf', 'x', 'y', 'color', 'pool_index')
 
-    def __init__(self, fbuf, start_position, color=color565(255, 255, 255)):
+    def __init__(self, fbuf, start_position=(0, 0), color=color565(255, 255, 255)):
         self.fbuf = fbuf
         self.x = start_position[0]
         self.y = start_position[1]
         self.color = color
+        self.pool_index = 0
+
+    def reset(self, start_position):
+        self.x = start_position[0]
+        self.y = start_position[1]
 
     def update(self):
         self.y -= 2
 
+    # bounding box (x, y, w, h) as drawn by draw(), None if not visible
+    def bounds(self):
+        if self.y <= 0:
+            return None
+        return (int(self.x+1) - 2, int(self.y+1) - 2, 6, 5)
+
     def draw(self):
         if self.y <= 0:
             return
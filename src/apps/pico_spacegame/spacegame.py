@@ -5,8 +5,8 @@ from apps.pico_spacegame.constants import *
 from apps.pico_spacegame.enemies import Enemies
 from apps.pico_spacegame.player import Player
 from apps.pico_spacegame.shot import Shot
-from drivers import color565
-from extensions import fb
+from drivers import FlushScheduler, color565
+from extensions import dirty, fb, loop, pool
 
 
 class SpaceGame(object):
@@ -23,7 +23,8 @@ class SpaceGame(object):
         (15, 5)
     ]
 
-    def __init__(self, display, touch, text_color=color565(0xff, 0xff, 0xff), bg_color=color565(0, 0, 0)):
+    def __init__(self, display, touch, text_color=color565(0xff, 0xff, 0xff), bg_color=color565(0, 0, 0),
+                 dirty_redraw=True):
         self.display = display
         self.width = min(display.width, 140)  # limit width (memory limit)
         self.height = min(display.height, 140)  # limit height (memory limit)
@@ -43,19 +44,33 @@ class SpaceGame(object):
         self.spaceship = Actor(self.fbuf, "/apps/pico_spacegame/spacecraftimg.spr", (self.width//2, self.height-20))
         self.enemies = Enemies(self.fbuf)
 
-        self.timer = utime.time()
+        self.timer = utime.ticks_ms()
 
-        # List to track self.shots
-        self.shots = []
+        # Pool to track self.shots
+        self.shots = pool.EntityPool(lambda: Shot(self.fbuf), 8)
         # Prevent continuous self.shots
-        self.shot_last_time = utime.time()
-        # min. time between self.shots
-        self.shot_delay = 1
+        self.shot_last_time = utime.ticks_ms()
+        # min. time between self.shots in ms
+        self.shot_delay = 1000
 
         self.player1 = Player(self.fbuf)
 
         self.game_status = GAME_READY
 
+        # dirty redraw: only clear, redraw and push regions that changed since the last frame
+        self.dirty_redraw = dirty_redraw
+        self.dirty_rects = dirty.DirtyRects(self.width, self.height)
+        self.drawn_status = None
+        self.drawn_rects = set()
+        self.full_flush = True
+
+        # writes follow the panel refresh to avoid tearing
+        self.flush_scheduler = FlushScheduler(display)
+
+        # updates run at a fixed rate, so game speed doesn't depend on render speed
+        self.game_loop = loop.GameLoop(self.update, self.draw, self.flush, step_ms=33,
+                                       deadline=self.flush_scheduler.deadline_us)
+
     def touch_handler(self, x, y):
         if x > 20 and x <= self.display.width - 20 and y > 20 and y <= self.display.height - 20:
             self.touch_x = x - self.display_x
@@ -64,6 +79,15 @@ class SpaceGame(object):
     # similar to pgzero draw
 
     def draw(self):
+        if self.dirty_redraw and self.game_status == GAME_PLAY and self.drawn_status == GAME_PLAY:
+            self.draw_dirty()
+            return
+        # redraw everything when not in dirty mode or the screen changed
+        self.full_flush = not self.dirty_redraw or self.drawn_status != self.game_status
+        self.dirty_rects.clear()
+        self.drawn_status = self.game_status
+        if not self.full_flush:
+            return  # static screen, nothing to do
         self.fbuf.fill(self.bg_color)
         # Display game over message
         if (self.game_status == GAME_READY):
@@ -76,14 +100,78 @@ class SpaceGame(object):
         elif (self.game_status == GAME_PLAY):
             self.spaceship.draw()
             self.enemies.draw()
-            for this_shot in self.shots:
+            shots = self.shots.items
+            for idx in range(self.shots.count - 1, -1, -1):
+                this_shot = shots[idx]
                 this_shot.draw()
             # Display score and number of lives
-            self.fbuf.text(str(self.player1.score), 10, 10, self.text_color, self.bg_color, fonts.tt14)
-            self.fbuf.text(self.player1.get_score_string(), self.width-20, 10,
-                           self.text_color, self.bg_color, fonts.tt14)
+            for text, x, y in self.get_status_texts():
+                self.fbuf.text(text, x, y, self.text_color, self.bg_color, fonts.tt14)
+            self.drawn_rects = self.get_frame_rects()
+
+    def draw_dirty(self):
+        # everything that appeared, disappeared or moved is dirty
+        frame_rects = self.get_frame_rects()
+        for rect in frame_rects ^ self.drawn_rects:
+            self.dirty_rects.add(rect[0], rect[1], rect[2], rect[3])
+        self.drawn_rects = frame_rects
+
+        for x, y, w, h in self.dirty_rects:
+            self.fbuf.fill_rect(x, y, w, h, self.bg_color)
+        # redraw whatever overlaps the cleared regions, in normal draw order
+        if self.dirty_rects.intersects(*self.spaceship.bounds()):
+            self.spaceship.draw()
+        asteroids = self.enemies.asteroids.items
+        for idx in range(self.enemies.asteroids.count - 1, -1, -1):
+            this_asteroid = asteroids[idx]
+            bounds = this_asteroid.bounds()
+            if bounds and self.dirty_rects.intersects(*bounds):
+                this_asteroid.draw()
+        shots = self.shots.items
+        for idx in range(self.shots.count - 1, -1, -1):
+            this_shot = shots[idx]
+            bounds = this_shot.bounds()
+            if bounds and self.dirty_rects.intersects(*bounds):
+                this_shot.draw()
+        for text, x, y in self.get_status_texts():
+            if self.dirty_rects.intersects(x, y, fonts.tt14.get_width(text), fonts.tt14.height()):
+                self.fbuf.text(text, x, y, self.text_color, self.bg_color, fonts.tt14)
+
+    def get_status_texts(self):
+        # (text, x, y) of score and number of lives
+        return [
+            (str(self.player1.score), 10, 10),
+            (self.player1.get_score_string(), self.width-20, 10),
+        ]
+
+    def get_frame_rects(self):
+        # set of (x, y, w, h[, text]) of everything visible in the current frame
+        rects = set()
+        rects.add(self.spaceship.bounds())
+        asteroids = self.enemies.asteroids.items
+        for idx in range(self.enemies.asteroids.count - 1, -1, -1):
+            this_asteroid = asteroids[idx]
+            bounds = this_asteroid.bounds()
+            if bounds:
+                rects.add(bounds)
+        shots = self.shots.items
+        for idx in range(self.shots.count - 1, -1, -1):
+            this_shot = shots[idx]
+            bounds = this_shot.bounds()
+            if bounds:
+                rects.add(bounds)
+        for text, x, y in self.get_status_texts():
+            rects.add((x, y, fonts.tt14.get_width(text), fonts.tt14.height(), text))
+        return rects
+
+    def flush(self):
         # update the display with the framebuffer
-        self.display.blit(self.fbuf, self.display_x, self.display_y)
+        if self.full_flush:
+            self.flush_scheduler.blit(self.fbuf, self.display_x, self.display_y)
+            self.full_flush = False
+            return
+        self.flush_scheduler.blit_regions(self.fbuf, self.dirty_rects, self.display_x, self.display_y)
+        self.dirty_rects.clear()
 
     # similar to pgzero update
     def update(self):
@@ -93,33 +181,37 @@ class SpaceGame(object):
                 self.game_status = GAME_PLAY
                 self.player1.reset()
         elif self.game_status == GAME_OVER:
-            if ((utime.time() > self.timer + 4) and self.touch_x >= 0):
+            if ((utime.ticks_diff(utime.ticks_ms(), self.timer) > 4000) and self.touch_x >= 0):
                 self.game_status = GAME_PLAY
                 self.player1.reset()
         elif (self.game_status == GAME_PLAY):
             self.enemies.update()
             # check for end of level
             if (self.enemies.check_crash((self.spaceship.x, self.spaceship.y), self.spacecraft_hit_pos)):
-                self.timer = utime.time()
+                self.timer = utime.ticks_ms()
                 self.player1.lives -= 1
                 if (self.player1.lives <= 0):
                     self.game_status = GAME_OVER
             if (self.touch_x >= 0 and self.touch_x < self.width):
                 self.spaceship.x = self.touch_x
-                if ((self.shot_last_time + self.shot_delay) < utime.time()):
-                    self.shots.append(Shot(self.fbuf, (self.spaceship.x, self.spaceship.y-25)))
-                    self.shot_last_time = utime.time()
+                if utime.ticks_diff(utime.ticks_ms(), self.shot_last_time) > self.shot_delay:
+                    this_shot = self.shots.acquire()
+                    if this_shot is not None:
+                        this_shot.reset((self.spaceship.x, self.spaceship.y-25))
+                        self.shot_last_time = utime.ticks_ms()
             # Update existing self.shots
-            for this_shot in self.shots:
+            shots = self.shots.items
+            for idx in range(self.shots.count - 1, -1, -1):
+                this_shot = shots[idx]
                 # Update position of shot
                 this_shot.update()
                 if this_shot.y <= 0:
-                    self.shots.remove(this_shot)
+                    self.shots.release(this_shot)
                 # Check if hit asteroid or enemy
                 elif self.enemies.check_shot(this_shot.x, this_shot.y):
                     self.player1.score += 10
                     # remove shot (otherwise it continues to hit others)
-                    self.shots.remove(this_shot)
+                    self.shots.release(this_shot)
 
         # clear touch input
         self.touch_x = -1
@@ -127,6 +219,4 @@ class SpaceGame(object):
 
     def run(self):
         # Do nothing - but continue to display the image
-        while True:
-            self.draw()
-            self.update()
+        self.game_loop.run()
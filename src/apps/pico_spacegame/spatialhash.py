@@ -0,0 +1,61 @@
+class SpatialHash:
+    """Uniform grid that maps cells to the objects overlapping them.
+
+    Used as collision broad-phase: a point query only returns the objects
+    registered in the cell the point falls into.
+    """
+
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.cells = {}
+        # cell range (cx1, cy1, cx2, cy2) of every registered object
+        self.ranges = {}
+
+    def _key(self, cx, cy):
+        # collisions of far away cells only add candidates, they don't lose any
+        return cy * 1024 + cx
+
+    def update(self, obj, x1, y1, x2, y2):
+        """Register obj with the bounding box x1,y1 - x2,y2 (inclusive)."""
+        size = self.cell_size
+        cell_range = (int(x1) // size, int(y1) // size, int(x2) // size, int(y2) // size)
+        old_range = self.ranges.get(obj)
+        if old_range == cell_range:
+            return
+        if old_range is not None:
+            self._unlink(obj, old_range)
+        self.ranges[obj] = cell_range
+        cx1, cy1, cx2, cy2 = cell_range
+        for cy in range(cy1, cy2 + 1):
+            for cx in range(cx1, cx2 + 1):
+                key = self._key(cx, cy)
+                cell = self.cells.get(key)
+                if cell is None:
+                    self.cells[key] = [obj]
+                else:
+                    cell.append(obj)
+
+    def remove(self, obj):
+        """Unregister obj, does nothing if it is not registered."""
+        cell_range = self.ranges.pop(obj, None)
+        if cell_range is not None:
+            self._unlink(obj, cell_range)
+
+    def clear(self):
+        self.cells.clear()
+        self.ranges.clear()
+
+    def query(self, x, y):
+        """Return the objects whose cells contain the point x,y."""
+        size = self.cell_size
+        return self.cells.get(self._key(int(x) // size, int(y) // size), ())
+
+    def _unlink(self, obj, cell_range):
+        cx1, cy1, cx2, cy2 = cell_range
+        for cy in range(cy1, cy2 + 1):
+            for cx in range(cx1, cx2 + 1):
+                key = self._key(cx, cy)
+                cell = self.cells[key]
+                cell.remove(obj)
+                if not cell:
+                    del self.cells[key]
@@ -1,8 +1,12 @@
 """Main entry point."""
+import utime
+
+start_ms = utime.ticks_ms()  # measures imports and display init
+
 from machine import PWM, SPI, Pin
 
 from diagnostics import Diagnostics
-from drivers import Display, Touch
+from drivers import Display, SPIBus, Touch
 
 
 def main():
@@ -10,8 +14,14 @@ def main():
     spi2 = SPI(1, baudrate=51200000, sck=Pin(10), mosi=Pin(11), miso=Pin(12))
     pwm = PWM(Pin(15))
 
-    display = Display(spi2, pwm, cs=Pin(13), dc=Pin(14))
+    display = Display(spi2, pwm, cs=Pin(13), dc=Pin(14), warm_resume=True)
     touch = Touch(spi1, cs=Pin(9), int_pin=Pin(8))
+    print(f'display ready after {utime.ticks_diff(utime.ticks_ms(), start_ms)}ms')
+
+    # boards where display and touch controller share one bus:
+    # bus = SPIBus(spi2)
+    # display = Display(bus.device(baudrate=51200000), pwm, cs=Pin(13), dc=Pin(14))
+    # touch = Touch(bus.device(baudrate=1000000), cs=Pin(9), int_pin=Pin(8))
 
     try:
         Diagnostics(display, touch).run()
@@ -1,11 +1,17 @@
-from apps import AppLauncher
 from extensions import input
+from fonts import FONTS
 from utils import COMMON_COLORS
+from utils.lazy_registry import LazyRegistry
 
-from diagnostics.draw_test import DrawTest
-from diagnostics.font_test import FontTest
-from diagnostics.tools import Tools
-from diagnostics.touch_test import TouchTest
+# test modules are imported on first use
+TESTS = LazyRegistry([
+    ['apps', 'apps'],
+    ['tools', 'diagnostics.tools'],
+    ['draw_test', 'diagnostics.draw_test'],
+    ['font_test', 'diagnostics.font_test'],
+    ['touch_test', 'diagnostics.touch_test'],
+    ['benchmark', 'diagnostics.benchmark'],
+])
 
 
 class Diagnostics(object):
@@ -14,25 +20,22 @@ class Diagnostics(object):
         self.display = display
         self.touch = touch
         self.bg_color_idx = 0
+        self.tests = {}  # name: test instance
 
     def run(self):
-        app_launcher = AppLauncher(self.display, self.touch)
-        tools = Tools(self.display)
-        draw_test = DrawTest(self.display)
-        font_test = FontTest(self.display)
-        touch_test = TouchTest(self.display, self.touch)
-
         while True:
             bg_color = COMMON_COLORS[self.bg_color_idx]
             print('Diagnostics menu:')
             tests = [
                 ['Clear display', lambda: self.clear_screen(bg_color)],
                 ['Cycle background color', self.cylce_bg_color],
-                ['Tools', lambda: tools.run()],
-                ['Apps', lambda: app_launcher.run(bg_color)],
-                ['Draw tests', lambda: draw_test.run(bg_color)],
-                ['Font tests', lambda: font_test.run(bg_color)],
-                ['Touch tests', lambda: touch_test.run(bg_color)],
+                ['Tools', lambda: self.get_test('tools', 'Tools', self.display).run()],
+                ['Apps', lambda: self.get_test('apps', 'AppLauncher', self.display, self.touch).run(bg_color)],
+                ['Draw tests', lambda: self.get_test('draw_test', 'DrawTest', self.display).run(bg_color)],
+                ['Font tests', lambda: self.get_test('font_test', 'FontTest', self.display).run(bg_color)],
+                ['Touch tests', lambda: self.get_test('touch_test', 'TouchTest', self.display, self.touch).run(bg_color)],
+                ['Benchmark', lambda: self.get_test('benchmark', 'Benchmark', self.display).run(bg_color, filename='/benchmark.csv')],
+                ['Unload tests', self.unload_tests],
                 ['Exit', None],
             ]
             for idx, test in enumerate(tests):
@@ -44,6 +47,21 @@ class Diagnostics(object):
 
             tests[test_idx][1]()
 
+    def get_test(self, name, class_name, *args):
+        """Return the test instance of name, the module is imported on first use."""
+        test = self.tests.get(name)
+        if test is None:
+            test = self.tests[name] = getattr(TESTS[name], class_name)(*args)
+        return test
+
+    def unload_tests(self):
+        """Drop all test instances and modules (and fonts) to reclaim RAM."""
+        if 'tools' in self.tests:
+            self.tests['tools'].profiler.disable()
+        self.tests = {}
+        TESTS.unload()
+        FONTS.unload()
+
     def clear_screen(self, bg_color):
         self.display.scroll_abs(0, 0)
         self.display.fill(bg_color)
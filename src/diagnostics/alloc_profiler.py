@@ -0,0 +1,87 @@
+import gc
+
+import utime
+
+from extensions import fb
+
+
+class AllocProfiler(object):
+    """Measures heap allocations and GC collections per drawing primitive call.
+
+    A collection during a call shows up as a drop of gc.mem_alloc(), the
+    duration of such a call is taken as GC pause (including the call itself).
+    """
+
+    SPRITE_FILE = '/apps/pico_spacegame/spacecraftimg.spr'
+
+    def __init__(self, display, iterations=100):
+        self.display = display
+        self.fbuf = fb.FrameBufferEx(None, self.display.width, self.display.height, fbuf=self.display)
+        self.iterations = iterations
+        self.results = []  # [name, calls, bytes per call, max bytes, collections, max gc pause us]
+
+    def run(self, color=0xFFFF):
+        """Measure all workloads and print the report."""
+        self.results = []
+        for name, func in self.workloads(color):
+            self.measure(name, func)
+        print(self.report())
+
+    def workloads(self, color):
+        """Return the workloads as [name, func]."""
+        fbuf = self.fbuf
+        display = self.display
+        workloads = [
+            ['FrameBufferEx.text', lambda i: fbuf.text('Allocations', 0, i % 200, color)],
+            ['Display.fill_rect', lambda i: display.fill_rect(i % 200, 0, 40, 40, color)],
+            ['Display.hline', lambda i: display.hline(0, i % 300, 100, color)],
+            ['Display.line', lambda i: display.line(0, 0, 100, i % 300, color)],
+            ['FrameBufferEx.polygon', lambda i: fbuf.polygon(6, 120, 160, 10 + i % 50, color)],
+        ]
+        try:
+            from apps.pico_spacegame.actor import Actor
+            actor = Actor(fbuf, self.SPRITE_FILE, (fbuf.width // 2, fbuf.height // 2))
+        except (ImportError, OSError) as e:
+            print(f'skipping Actor.draw: {e}')
+        else:
+            def rotate_actor(i):
+                # every quarter turn rebuilds the cached rotated sprite
+                actor.angle = (i % 4) * 90
+                actor.get_sprite()
+            workloads.append(['Actor.draw', lambda i: actor.draw()])
+            workloads.append(['Actor rotation', rotate_actor])
+        return workloads
+
+    def measure(self, name, func):
+        """Call func(i) for all iterations and append the result."""
+        gc.collect()
+        total_bytes = 0
+        max_bytes = 0
+        measured = 0
+        collections = 0
+        max_pause_us = 0
+        for i in range(self.iterations):
+            before = gc.mem_alloc()
+            start = utime.ticks_us()
+            func(i)
+            elapsed = utime.ticks_diff(utime.ticks_us(), start)
+            allocated = gc.mem_alloc() - before
+            if allocated < 0:
+                # the heap was collected during the call
+                collections += 1
+                if elapsed > max_pause_us:
+                    max_pause_us = elapsed
+                continue
+            measured += 1
+            total_bytes += allocated
+            if allocated > max_bytes:
+                max_bytes = allocated
+        self.results.append([name, self.iterations, total_bytes // max(measured, 1), max_bytes,
+                             collections, max_pause_us])
+
+    def report(self):
+        """Return the results as a table."""
+        lines = [f'{"primitive":<24} {"calls":>6} {"B/call":>7} {"max_B":>7} {"gcs":>4} {"max_gc_us":>9}']
+        for name, calls, bytes_per_call, max_bytes, collections, max_pause_us in self.results:
+            lines.append(f'{name:<24} {calls:>6} {bytes_per_call:>7} {max_bytes:>7} {collections:>4} {max_pause_us:>9}')
+        return '\n'.join(lines)
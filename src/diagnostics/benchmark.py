@@ -0,0 +1,116 @@
+import utime
+
+from extensions import fb
+from fonts import FONTS
+
+
+class Benchmark(object):
+    """Timed draw workloads with warm-up and repetitions, reported as CSV.
+
+    Every workload is run `warmup` times untimed and `repeat` times timed,
+    the best run is used for the rates. If the display supports SPI stats
+    one extra run is accounted to get the transferred bytes.
+    """
+
+    CSV_HEADER = 'workload,ops,best_us,avg_us,ops_per_s,pixels_per_s,bytes_per_s'
+    TEXT = 'The quick brown fox'
+
+    def __init__(self, display, warmup=1, repeat=5):
+        self.display = display
+        self.fbuf = fb.FrameBufferEx(None, self.display.width, self.display.height, fbuf=self.display)
+        self.warmup = warmup
+        self.repeat = repeat
+        self.results = []  # [name, ops, best_us, avg_us, pixels, bytes]
+
+    def run(self, bg_color, color=0xFFFF, filename=None):
+        """Run all workloads, print the CSV and optionally write it to filename."""
+        self.results = []
+        print(self.CSV_HEADER)
+        for name, ops, pixels, func in self.workloads(bg_color, color):
+            self.run_workload(name, ops, pixels, func)
+            print(self.csv_row(self.results[-1]))
+        self.fbuf.fill(bg_color)
+        if filename:
+            with open(filename, 'w') as file:
+                file.write(self.csv())
+            print(f'results written to {filename}')
+
+    def workloads(self, bg_color, color):
+        """Return the standard workloads as [name, ops, pixels per run, func].
+
+        Pixel counts of the shapes are nominal (radius 30).
+        """
+        fbuf = self.fbuf
+        width = fbuf.width
+        height = fbuf.height
+        cx = width // 2
+        cy = height // 2
+        sprite = fb.FrameBufferEx(bytearray(64 * 64 * 2), 64, 64)
+        sprite.fill(color)
+
+        workloads = [
+            ['fill', 1, width * height, lambda: fbuf.fill(bg_color)],
+            ['fill_rect_40', 20, 20 * 40 * 40, lambda: self._repeat(20, lambda i: fbuf.fill_rect(i * 8, i * 8, 40, 40, color))],
+            ['hline_100', 50, 50 * 100, lambda: self._repeat(50, lambda i: fbuf.hline(0, i * 4, 100, color))],
+            ['vline_100', 50, 50 * 100, lambda: self._repeat(50, lambda i: fbuf.vline(i * 4, 0, 100, color))],
+            ['line_diagonal', 10, 10 * 100, lambda: self._repeat(10, lambda i: fbuf.line(i * 10, 0, i * 10 + 99, 99, color))],
+            ['circle_30', 5, 5 * 188, lambda: self._repeat(5, lambda i: fbuf.circle(cx, cy, 30 - i, color))],
+            ['fill_circle_30', 5, 5 * 2827, lambda: self._repeat(5, lambda i: fbuf.fill_circle(cx, cy, 30 - i, color))],
+            ['polygon_6', 5, 5 * 180, lambda: self._repeat(5, lambda i: fbuf.polygon(6, cx, cy, 30 - i, color))],
+            ['fill_polygon_6', 5, 5 * 2338, lambda: self._repeat(5, lambda i: fbuf.fill_polygon(6, cx, cy, 30 - i, color))],
+            ['blit_64', 10, 10 * 64 * 64, lambda: self._repeat(10, lambda i: fbuf.blit(sprite, i * 16, i * 16))],
+        ]
+        for font_name, font in FONTS.items():
+            text_pixels = min(font.get_width(self.TEXT), width) * font.height()
+            workloads.append([f'text_{font_name}', 5, 5 * text_pixels,
+                              lambda font=font: self._repeat(5, lambda i: fbuf.text(self.TEXT, 0, i * font.height(), color, font=font))])
+        if self.display.rotation == 0:
+            workloads.append(['scroll', 100, 0, lambda: self._repeat(100, lambda i: self.display.scroll_abs(0, i))])
+        return workloads
+
+    def run_workload(self, name, ops, pixels, func):
+        """Time func and append the result."""
+        for _ in range(self.warmup):
+            func()
+        best_us = None
+        total_us = 0
+        for _ in range(self.repeat):
+            start = utime.ticks_us()
+            func()
+            elapsed = utime.ticks_diff(utime.ticks_us(), start)
+            total_us += elapsed
+            if best_us is None or elapsed < best_us:
+                best_us = elapsed
+        self.results.append([name, ops, best_us, total_us // self.repeat, pixels, self._count_bytes(func)])
+        if self.display.rotation == 0:
+            self.display.scroll_abs(0, 0)
+
+    def csv(self):
+        """Return the results as CSV."""
+        return '\n'.join([self.CSV_HEADER] + [self.csv_row(result) for result in self.results]) + '\n'
+
+    def csv_row(self, result):
+        name, ops, best_us, avg_us, pixels, num_bytes = result
+        best_us = max(best_us, 1)
+        return f'{name},{ops},{best_us},{avg_us},{ops * 1000000 // best_us},' \
+               f'{pixels * 1000000 // best_us},{num_bytes * 1000000 // best_us}'
+
+    def _repeat(self, ops, func):
+        for i in range(ops):
+            func(i)
+
+    def _count_bytes(self, func):
+        """Return the SPI bytes transferred by one run of func (0 if not supported)."""
+        if not hasattr(self.display, 'enable_stats'):
+            return 0
+        was_enabled = self.display.stats is not None and self.display.stats.attached
+        saved = self.display.stats.counters if self.display.stats is not None else {}
+        stats = self.display.enable_stats()
+        stats.reset()
+        func()
+        num_bytes = sum(counters[stats.COMMAND_BYTES] + counters[stats.DATA_BYTES]
+                        for counters in stats.counters.values())
+        stats.counters = saved
+        if not was_enabled:
+            self.display.enable_stats(False)
+        return num_bytes
@@ -62,4 +62,4 @@ class FontTest(object):
 
         font_idx = input.read_int('font>')
         if font_idx < len(FONTS):
-            self.font = list(FONTS.values())[font_idx]
+            self.font = FONTS[FONTS.keys()[font_idx]]
@@ -0,0 +1,118 @@
+from array import array
+
+import utime
+
+
+class Profiler(object):
+    """Runtime profiling hooks for methods of arbitrary classes.
+
+    While enabled, the registered methods are replaced on their class by a
+    wrapper that records the call count, total and max microseconds and the
+    most recent durations in a ring buffer. Disabling restores the original
+    methods, so there is no overhead at all while the profiler is off.
+    """
+
+    # entry indices
+    CALLS = 0
+    TOTAL_US = 1
+    MAX_US = 2
+    SAMPLES = 3
+    SAMPLE_IDX = 4
+
+    def __init__(self, num_samples=16):
+        """Initialize profiler.
+
+        Args:
+            num_samples (int): Number of recent durations kept per method
+        """
+        self.num_samples = num_samples
+        self.enabled = False
+        self.entries = {}  # 'Class.method': [calls, total us, max us, samples, sample idx]
+        self._targets = []  # [class, method name]
+        self._originals = {}  # 'Class.method': original function
+
+    def add(self, cls, *names):
+        """Register methods of cls for profiling."""
+        for name in names:
+            self._targets.append([cls, name])
+            if self.enabled:
+                self._hook(cls, name)
+
+    def enable(self):
+        """Install the profiling hooks."""
+        if not self.enabled:
+            for cls, name in self._targets:
+                self._hook(cls, name)
+            self.enabled = True
+
+    def disable(self):
+        """Restore the original methods."""
+        if self.enabled:
+            for cls, name in self._targets:
+                key = f'{cls.__name__}.{name}'
+                setattr(cls, name, self._originals.pop(key))
+            self.enabled = False
+
+    def reset(self):
+        """Reset all recorded values."""
+        for entry in self.entries.values():
+            entry[self.CALLS] = 0
+            entry[self.TOTAL_US] = 0
+            entry[self.MAX_US] = 0
+            entry[self.SAMPLE_IDX] = 0
+            samples = entry[self.SAMPLES]
+            for idx in range(len(samples)):
+                samples[idx] = 0
+
+    def recent(self, key):
+        """Return the recent durations of a method in microseconds, oldest first."""
+        entry = self.entries[key]
+        samples = entry[self.SAMPLES]
+        count = entry[self.SAMPLE_IDX]
+        if count <= len(samples):
+            return list(samples[:count])
+        start = count % len(samples)
+        return list(samples[start:]) + list(samples[:start])
+
+    def report(self):
+        """Return the recorded values as a table, sorted by total time."""
+        lines = [f'{"method":<28} {"calls":>7} {"total_ms":>9} {"avg_us":>7} {"max_us":>7}  recent_us']
+        rows = sorted(self.entries.items(), key=lambda item: item[1][self.TOTAL_US], reverse=True)
+        for key, entry in rows:
+            calls = entry[self.CALLS]
+            if not calls:
+                continue
+            total_us = entry[self.TOTAL_US]
+            recent = ' '.join(str(sample) for sample in self.recent(key)[-4:])
+            lines.append(f'{key:<28} {calls:>7} {total_us // 1000:>9} {total_us // calls:>7} '
+                         f'{entry[self.MAX_US]:>7}  {recent}')
+        return '\n'.join(lines)
+
+    def _hook(self, cls, name):
+        key = f'{cls.__name__}.{name}'
+        if key in self._originals:
+            return
+        func = getattr(cls, name)
+        self._originals[key] = func
+        setattr(cls, name, self._wrap(key, func))
+
+    def _wrap(self, key, func):
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = [0, 0, 0, array('L', [0] * self.num_samples), 0]
+        samples = entry[self.SAMPLES]
+        num_samples = self.num_samples
+
+        def wrapper(*args, **kwargs):
+            start = utime.ticks_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = utime.ticks_diff(utime.ticks_us(), start)
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+                samples[entry[4] % num_samples] = elapsed
+                entry[4] += 1
+        return wrapper
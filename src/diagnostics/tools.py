@@ -1,13 +1,21 @@
 import gc
 import os
 
-from extensions import input
+from drivers import Display, Touch
+from extensions import fb, input
+
+from diagnostics.alloc_profiler import AllocProfiler
+from diagnostics.profiler import Profiler
 
 
 class Tools(object):
 
     def __init__(self, display):
         self.display = display
+        self.profiler = Profiler()
+        self.profiler.add(Display, 'fill_rect', 'draw_chunk', 'write_ram', 'blit', 'blit_region')
+        self.profiler.add(fb.FrameBufferEx, 'text', 'blit', 'fill_circle', 'fill_polygon', 'lines')
+        self.profiler.add(Touch, 'sample', 'poll', 'poll_raw', 'normalize')
 
     def run(self):
         while True:
@@ -17,6 +25,12 @@ class Tools(object):
                 ['Show free disk space', lambda: self._get_free_diskspace('/')],
                 ['Show display info', lambda: print(self.display.get_info())],
                 ['Change brightness', lambda: self.display.set_brightness(input.read_int('brightness>'))],
+                ['Change power state', self._change_power_state],
+                ['Toggle SPI stats', self._toggle_spi_stats],
+                ['Show SPI stats', self._show_spi_stats],
+                ['Toggle profiler', self._toggle_profiler],
+                ['Show profiler report', self._show_profiler_report],
+                ['Show allocations per primitive', lambda: AllocProfiler(self.display).run()],
                 ['Return', None]
             ]
             for idx, tool in enumerate(tools):
@@ -39,3 +53,39 @@ class Tools(object):
         f_bavail = fs_stats[4]
         free_space_kb = (f_bsize * f_bavail) // 1024
         print(f'Free disk space: {free_space_kb}kB')
+
+    def _change_power_state(self):
+        display = self.display
+        print(f'{display.POWER_NORMAL}: normal, {display.POWER_IDLE}: idle (8 colors), '
+              f'{display.POWER_PARTIAL}: partial (top 20 rows), {display.POWER_SLEEP}: sleep')
+        state = input.read_int('state>')
+        if display.POWER_NORMAL <= state <= display.POWER_SLEEP:
+            display.set_power_state(state)
+            print(f'power state {state}, {display.frame_rate()}Hz')
+
+    def _toggle_spi_stats(self):
+        stats = self.display.stats
+        enabled = stats is None or not stats.attached
+        self.display.enable_stats(enabled)
+        print(f'SPI stats {"enabled" if enabled else "disabled"}')
+
+    def _show_spi_stats(self):
+        stats = self.display.stats
+        if stats is None:
+            print('SPI stats not enabled')
+            return
+        print(stats.report())
+        if input.read_int('reset (0/1)>'):
+            stats.reset()
+
+    def _toggle_profiler(self):
+        if self.profiler.enabled:
+            self.profiler.disable()
+        else:
+            self.profiler.enable()
+        print(f'profiler {"enabled" if self.profiler.enabled else "disabled"}')
+
+    def _show_profiler_report(self):
+        print(self.profiler.report())
+        if input.read_int('reset (0/1)>'):
+            self.profiler.reset()
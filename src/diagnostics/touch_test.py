@@ -1,14 +1,21 @@
-from extensions import fb, input
+from time import sleep
+
+import utime
+
+from extensions import fb, input, stroke
 from utils import COMMON_COLORS
 
 
 class TouchTest(object):
+    STROKE_GAP_MS = 100  # a longer pause between samples starts a new stroke
 
     def __init__(self, display, touch):
         self.display = display
         self.fbuf = fb.FrameBufferEx(None, self.display.width, self.display.height, fbuf=self.display)
         self.touch = touch
         self.pen_color_idx = 1
+        self.stroke = stroke.StrokeRenderer(self.fbuf, 4, COMMON_COLORS[self.pen_color_idx])
+        self.last_touch_ms = utime.ticks_ms()
 
     def run(self, bg_color):
         try:
@@ -18,6 +25,7 @@ class TouchTest(object):
                 tests = [
                     ['Clear display', lambda: self.fbuf.fill(bg_color)],
                     ['Cycle pen color', self.cylce_pen_color],
+                    ['Calibrate', lambda: self.calibrate(bg_color)],
                     ['Return', None]
                 ]
                 for idx, test in enumerate(tests):
@@ -35,9 +43,51 @@ class TouchTest(object):
     def touch_handler(self, x, y):
         print(f'touch: {x}, {y}')
         y += self.fbuf.scroll()[1]
-        self.fbuf.fill_circle(x, y, 4, COMMON_COLORS[self.pen_color_idx])
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, self.last_touch_ms) > self.STROKE_GAP_MS:
+            self.stroke.end()
+        self.last_touch_ms = now
+        self.stroke.color = COMMON_COLORS[self.pen_color_idx]
+        self.stroke.add(x, y)
 
     def cylce_pen_color(self):
         self.pen_color_idx += 1
         if self.pen_color_idx >= len(COMMON_COLORS):
             self.pen_color_idx = 1
+
+    def calibrate(self, bg_color):
+        """3-point calibration, stored in the touch calibration file."""
+        color = COMMON_COLORS[self.pen_color_idx]
+        width = self.display.width
+        height = self.display.height
+        targets = [
+            (width // 10, height // 10),
+            (width * 9 // 10, height // 2),
+            (width // 2, height * 9 // 10),
+        ]
+        schedule = self.touch.schedule
+        try:
+            # read the raw samples ourselves
+            self.touch.schedule = False
+            self.touch.set_rotation(self.display.rotation)
+            self.display.scroll_abs(0, 0)
+            points = []
+            for x, y in targets:
+                self.fbuf.fill(bg_color)
+                self.fbuf.hline(x - 10, y, 21, color)
+                self.fbuf.vline(x, y - 10, 21, color)
+                print(f'touch the target at {x}, {y}...')
+                while self.touch.poll_raw() is not None:
+                    pass
+                raw = None
+                while raw is None:
+                    sleep(0.05)
+                    raw = self.touch.poll_raw()
+                points.append((raw[0], raw[1], x, y))
+                sleep(0.5)  # wait for the pen to be lifted
+            self.touch.calibrate(points)
+            self.touch.save_calibration()
+            print(f'calibration saved to {self.touch.calibration_file}')
+        finally:
+            self.touch.schedule = schedule
+            self.fbuf.fill(bg_color)
@@ -1,3 +1,7 @@
 from drivers.ili9341 import Display
 from drivers.ili9341 import color565
 from drivers.xpt2046 import Touch
+from drivers.spi_bus import SPIBus
+from drivers.spi_stats import SPIStats
+from drivers.flush_scheduler import FlushScheduler
+from drivers.panel_group import PanelGroup, PatternBuffer
@@ -0,0 +1,173 @@
+# Tear-aware flush scheduling for the ILI9341 display driver.
+#
+# Boards without the TE pin can't sync to the panel refresh directly. The
+# scheduler estimates the refresh position from the configured frame rate
+# and a calibration read of the scanline (GET_SCANLINE). Updates are split
+# into bands along the scan direction and written in scan order, right
+# behind the refresh; a band that the refresh is about to run into is
+# delayed until it has passed. The time until the next refresh starts is
+# available as deadline, e.g. for the game loop. If the scanline can't be
+# read (or the panel sleeps) there is no deadline and updates are written
+# straight away.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+from utime import sleep_us, ticks_add, ticks_diff, ticks_ms, ticks_us
+
+
+class FlushScheduler(object):
+    """Writes framebuffer regions to a Display in step with the panel refresh."""
+
+    LINES = const(324)  # lines per frame including porches
+    FOSC = const(615000)  # internal oscillator (Hz)
+
+    def __init__(self, display, band_height=16, recalibrate_ms=1000):
+        """Initialize flush scheduler.
+
+        Args:
+            display (Display): Target display
+            band_height (Optional int): Lines written per band (default 16)
+            recalibrate_ms (Optional int): Re-read the scanline every n ms (default 1000)
+        """
+        self.display = display
+        self.band_height = band_height
+        self.recalibrate_ms = recalibrate_ms
+        self.has_scanline = False  # panel answers GET_SCANLINE
+        self.us_per_line = 0  # measured write speed of one band line
+        self.waits = 0
+        self.wait_us = 0
+        self.calibrate()
+
+    def calibrate(self):
+        """Sync the refresh estimate to the panel scanline."""
+        display = self.display
+        self._state = display.power_state
+        self._rate = display.frame_rates.get(self._state)
+        self._t0 = ticks_us()
+        self._calibrated_ms = ticks_ms()
+        self._line0 = 0
+        self.has_scanline = False
+        if not self.frame_us():
+            return  # sleeping, there is no refresh to follow
+        # the scanline is never 0 twice in a row if the panel can be read
+        line = display.get_scanline()
+        if not line:
+            line = display.get_scanline()
+        self.has_scanline = line != 0
+        self._line0 = line
+
+    def frame_us(self):
+        """Return the refresh period of the current power state in us (0 while the panel sleeps)."""
+        display = self.display
+        rate = display.frame_rates.get(display.power_state)
+        if rate is None:
+            return 0
+        diva, rtna = rate
+        return (rtna << diva) * self.LINES * 10000 // (self.FOSC // 100)  # stays a small int
+
+    def scanline(self):
+        """Return the estimated line the panel is refreshing (0 if the panel can't be read)."""
+        display = self.display
+        if display.power_state != self._state or display.frame_rates.get(self._state) is not self._rate or (
+                self.has_scanline and ticks_diff(ticks_ms(), self._calibrated_ms) > self.recalibrate_ms):
+            self.calibrate()
+        if not self.has_scanline:
+            return 0
+        frame_us = self.frame_us()
+        elapsed = ticks_diff(ticks_us(), self._t0)
+        if elapsed >= frame_us:
+            # move the reference to the start of the current frame, keeps ints small and ticks in range
+            frames = elapsed // frame_us
+            self._t0 = ticks_add(self._t0, frames * frame_us)
+            elapsed -= frames * frame_us
+        return (self._line0 + elapsed * self.LINES // frame_us) % self.LINES
+
+    def deadline_us(self):
+        """Return the estimated microseconds until the panel starts its next refresh.
+
+        Returns None if there is no deadline (the panel sleeps or its scanline can't be read).
+        """
+        line = self.scanline()
+        if not self.has_scanline:
+            return None
+        return (self.LINES - line) * self.frame_us() // self.LINES
+
+    def blit(self, fbuf, x, y):
+        """Draw a whole RGB565 framebuffer at the given coordinates."""
+        self.blit_regions(fbuf, ((0, 0, fbuf.width, fbuf.height),), x, y)
+
+    def blit_regions(self, fbuf, rects, x=0, y=0):
+        """Draw the x,y,w,h rects of a RGB565 framebuffer offset by x,y, in scan order."""
+        display = self.display
+        self.scanline()  # recalibrates if due
+        if not self.has_scanline:
+            # refresh position unknown, ordering and waiting would be guesswork
+            for sx, sy, w, h in rects:
+                display.blit_region(fbuf, sx, sy, w, h, x + sx, y + sy)
+            return
+        bands = []
+        for rect in rects:
+            self._split(bands, rect, x, y)
+        if not bands:
+            return
+        # scan order, starting with the band the refresh is in (it is written once the refresh has passed)
+        line = self.scanline()
+        bands.sort(key=lambda band: (band[1] - line) % self.LINES)
+        for first, last, sx, sy, w, h, dx, dy in bands:
+            self._wait_for(first, last)
+            start = ticks_us()
+            display.blit_region(fbuf, sx, sy, w, h, dx, dy)
+            lines = last - first + 1
+            us_per_line = ticks_diff(ticks_us(), start) // lines
+            self.us_per_line += (us_per_line - self.us_per_line) >> 2
+
+    def _wait_for(self, first, last):
+        """Wait while the refresh is in (or about to reach) lines first..last."""
+        frame_us = self.frame_us()
+        # lines the refresh advances while the band is written
+        lead = (last - first + 1) * self.us_per_line * self.LINES // frame_us
+        line = self.scanline()
+        if (line - first + lead) % self.LINES <= last - first + lead:
+            wait = ((last - line) % self.LINES + 1) * frame_us // self.LINES
+            self.waits += 1
+            self.wait_us += wait
+            sleep_us(wait)
+
+    def _split(self, bands, rect, x, y):
+        """Append the bands of rect as [first line, last line, sx, sy, w, h, dx, dy].
+
+        Only rotation 0 scrolls (like the autoscroll of Display.draw_chunk), bands never
+        wrap past the last panel line.
+        """
+        sx, sy, w, h = rect
+        dx = x + sx
+        dy = y + sy
+        display = self.display
+        rotation = display.rotation
+        band_height = self.band_height
+        if rotation in (0, 180):
+            # the refresh runs along y
+            lines = display.height
+            offset = 0
+            while offset < h:
+                rows = min(band_height, h - offset)
+                if rotation == 0:
+                    first = (dy + offset - display.scroll_pos) % lines
+                    rows = min(rows, lines - first)  # split where the scrolled area wraps
+                else:
+                    first = lines - (dy + offset + rows)
+                bands.append([max(first, 0), min(first + rows, lines) - 1,
+                              sx, sy + offset, w, rows, dx, dy + offset])
+                offset += rows
+        else:
+            # the refresh runs along x
+            lines = display.width
+            for offset in range(0, w, band_height):
+                cols = min(band_height, w - offset)
+                if rotation == 90:
+                    first = dx + offset
+                else:
+                    first = lines - (dx + offset + cols)
+                bands.append([max(first, 0), min(first + cols, lines) - 1,
+                              sx + offset, sy, cols, h, dx + offset, dy])
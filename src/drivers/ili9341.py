@@ -18,11 +18,10 @@
 #
 
 
-from time import sleep
-
 import framebuf
 import ustruct
 from ubinascii import hexlify
+from utime import sleep_ms, ticks_diff, ticks_ms
 
 
 def color565(r, g, b):
@@ -70,7 +69,10 @@ class Display(object):
     VSCRDEF = const(0x33)  # Vertical scrolling definition
     MADCTL = const(0x36)  # Memory access control
     VSCRSADD = const(0x37)  # Vertical scrolling start address
+    IDMOFF = const(0x38)  # Idle mode off
+    IDMON = const(0x39)  # Idle mode on (8 colors)
     PIXFMT = const(0x3A)  # COLMOD: Pixel format set
+    GET_SCANLINE = const(0x45)  # Get scanline
     WRITE_DISPLAY_BRIGHTNESS = const(0x51)  # Brightness hardware dependent!
     READ_DISPLAY_BRIGHTNESS = const(0x52)
     WRITE_CTRL_DISPLAY = const(0x53)
@@ -102,6 +104,20 @@ class Display(object):
     ENABLE3G = const(0xF2)  # Enable 3 gamma control
     PUMPRC = const(0xF7)  # Pump ratio control
 
+    # Power states
+    POWER_NORMAL = const(0)  # full colors, whole panel refreshed
+    POWER_IDLE = const(1)  # 8 colors (MSB of each color channel)
+    POWER_PARTIAL = const(2)  # only the partial area is refreshed, rest is black
+    POWER_SLEEP = const(3)  # panel off, GRAM retained
+
+    # Frame rate control register (DIVA, RTNA) per power state:
+    # frame rate = 615kHz / (RTNA * 324 lines * 2^DIVA) ~= 1898 / (RTNA << DIVA)
+    FRAME_RATE_REGS = {
+        POWER_NORMAL: FRMCTR1,
+        POWER_IDLE: FRMCTR2,
+        POWER_PARTIAL: FRMCTR3,
+    }
+
     ROTATE = {
         0: 0x48,
         90: 0x28,
@@ -109,19 +125,50 @@ class Display(object):
         270: 0xE8
     }
 
-    def __init__(self, spi, pwm, cs, dc, width=240, height=320, rotation=0):
+    # Initialization sequence: command, number of data bytes, data bytes, ...
+    INIT_SEQUENCE = bytes((
+        PWCTRB, 3, 0x00, 0xC1, 0x30,  # Pwr ctrl B
+        POSC, 4, 0x64, 0x03, 0x12, 0x81,  # Pwr on seq. ctrl
+        DTCA, 3, 0x85, 0x00, 0x78,  # Driver timing ctrl A
+        PWCTRA, 5, 0x39, 0x2C, 0x00, 0x34, 0x02,  # Pwr ctrl A
+        PUMPRC, 1, 0x20,  # Pump ratio control
+        DTCB, 2, 0x00, 0x00,  # Driver timing ctrl B
+        PWCTR1, 1, 0x23,  # Pwr ctrl 1
+        PWCTR2, 1, 0x10,  # Pwr ctrl 2
+        VMCTR1, 2, 0x3E, 0x28,  # VCOM ctrl 1
+        VMCTR2, 1, 0x86,  # VCOM ctrl 2
+        VSCRSADD, 2, 0x00, 0x00,  # Vertical scrolling start address
+        PIXFMT, 1, 0x55,  # COLMOD: Pixel format
+        FRMCTR1, 2, 0x00, 0x18,  # Frame rate ctrl normal mode: 79Hz
+        FRMCTR2, 2, 0x02, 0x1F,  # Frame rate ctrl idle mode: 15Hz
+        FRMCTR3, 2, 0x01, 0x1F,  # Frame rate ctrl partial mode: 30Hz
+        DFUNCTR, 3, 0x08, 0x82, 0x27,
+        ENABLE3G, 1, 0x00,  # Enable 3 gamma ctrl
+        GAMMASET, 1, 0x01,  # Gamma curve selected
+        GMCTRP1, 15, 0x0F, 0x31, 0x2B, 0x0C, 0x0E, 0x08, 0x4E,
+        0xF1, 0x37, 0x07, 0x10, 0x03, 0x0E, 0x09, 0x00,
+        GMCTRN1, 15, 0x00, 0x0E, 0x14, 0x03, 0x11, 0x07, 0x31,
+        0xC1, 0x48, 0x08, 0x0F, 0x0C, 0x31, 0x36, 0x0F,
+    ))
+
+    def __init__(self, spi, pwm, cs, dc, width=240, height=320, rotation=0, warm_resume=False, stats=False):
         """Initialize IL9341 Display.
 
         Args:
-            spi (Class Spi):  SPI interface for OLED
+            spi (Class Spi):  SPI interface for OLED (or a device of a shared SPIBus)
             pwm (Class PWM):  PWM for controlling the backlight
             cs (Class Pin):  Chip select pin
             dc (Class Pin):  Data/Command pin
             width (Optional int): Screen width (default 240)
             height (Optional int): Screen height (default 320)
             rotation (Optional int): Rotation must be 0 (default), 90, 180 or 270
+            warm_resume (Optional bool): Skip reset, initialization and clearing if the panel
+                                         is already configured (e.g. after a soft reboot)
+            stats (Optional bool): Enable SPI traffic accounting before the panel is initialized,
+                                   so init and resume traffic is counted (see enable_stats)
         """
         self.spi = spi
+        self.shared_bus = hasattr(spi, 'lock')  # see drivers/spi_bus.py
         self.pwm = pwm
         self.cs = cs
         self.dc = dc
@@ -129,46 +176,49 @@ class Display(object):
         self.height = height
         self.scroll_pos = 0
         self.rotation = rotation
+        self.stats = None  # see enable_stats()
+        self.pattern = None  # optional shared PatternBuffer for fills (see drivers/panel_group.py)
+        self.image_buffer_size = 2048  # bytes per chunk for draw_image()
+        self._image_bufs = None
+        self.brightness = 16384
+        self.power_state = self.POWER_NORMAL
+        self.frame_rates = {  # (DIVA, RTNA) as set by INIT_SEQUENCE
+            self.POWER_NORMAL: (0x00, 0x18),
+            self.POWER_IDLE: (0x02, 0x1F),
+            self.POWER_PARTIAL: (0x01, 0x1F),
+        }
+        self._slpin_ms = ticks_ms()  # last SLPIN/SWRESET, SLPOUT must wait 120ms
         if rotation not in self.ROTATE.keys():
             raise ValueError('Rotation must be 0, 90, 180 or 270.')
+        if stats:
+            self.enable_stats()
 
         # Initialize GPIO pins
         self.pwm.freq(500)
-        self.pwm.duty_u16(16384)
+        self.pwm.duty_u16(self.brightness)
         self.cs.init(self.cs.OUT, value=1)
         self.dc.init(self.dc.OUT, value=0)
 
+        self.resumed = warm_resume and self.is_configured()
+        if self.resumed:
+            # panel kept its configuration and GRAM (e.g. soft reboot), only reset scrolling and mode
+            self.write_cmd(self.VSCRDEF, *ustruct.pack('>HHH', 0, self.height, 0))
+            self.write_cmd(self.VSCRSADD, 0x00, 0x00)
+            self.write_cmd(self.IDMOFF)
+            self.write_cmd(self.NORON)
+            for state, (diva, rtna) in self.frame_rates.items():
+                self.write_cmd(self.FRAME_RATE_REGS[state], diva, rtna)
+            return
+
         # Send initialization commands
         self.write_cmd(self.SWRESET)  # Software reset
-        sleep(.1)
-        self.write_cmd(self.PWCTRB, 0x00, 0xC1, 0x30)  # Pwr ctrl B
-        self.write_cmd(self.POSC, 0x64, 0x03, 0x12, 0x81)  # Pwr on seq. ctrl
-        self.write_cmd(self.DTCA, 0x85, 0x00, 0x78)  # Driver timing ctrl A
-        self.write_cmd(self.PWCTRA, 0x39, 0x2C, 0x00, 0x34, 0x02)  # Pwr ctrl A
-        self.write_cmd(self.PUMPRC, 0x20)  # Pump ratio control
-        self.write_cmd(self.DTCB, 0x00, 0x00)  # Driver timing ctrl B
-        self.write_cmd(self.PWCTR1, 0x23)  # Pwr ctrl 1
-        self.write_cmd(self.PWCTR2, 0x10)  # Pwr ctrl 2
-        self.write_cmd(self.VMCTR1, 0x3E, 0x28)  # VCOM ctrl 1
-        self.write_cmd(self.VMCTR2, 0x86)  # VCOM ctrl 2
-        self.write_cmd(self.MADCTL, self.ROTATE[rotation])  # Memory access ctrl
-        self.write_cmd(self.VSCRDEF, *ustruct.pack('>HHH', 0, self.height, 0))  # Vertical scrolling definition
-        self.write_cmd(self.VSCRSADD, 0x00, 0x00)  # Vertical scrolling start address
-        self.write_cmd(self.PIXFMT, 0x55)  # COLMOD: Pixel format
-        self.write_cmd(self.FRMCTR1, 0x00, 0x18)  # Frame rate ctrl
-        self.write_cmd(self.DFUNCTR, 0x08, 0x82, 0x27)
-        self.write_cmd(self.ENABLE3G, 0x00)  # Enable 3 gamma ctrl
-        self.write_cmd(self.GAMMASET, 0x01)  # Gamma curve selected
-        self.write_cmd(self.GMCTRP1,
-                       0x0F, 0x31, 0x2B, 0x0C, 0x0E, 0x08, 0x4E,
-                       0xF1, 0x37, 0x07, 0x10, 0x03, 0x0E, 0x09, 0x00)
-        self.write_cmd(self.GMCTRN1,
-                       0x00, 0x0E, 0x14, 0x03, 0x11, 0x07, 0x31,
-                       0xC1, 0x48, 0x08, 0x0F, 0x0C, 0x31, 0x36, 0x0F)
-        self.write_cmd(self.SLPOUT)  # Exit sleep
-        sleep(.1)
+        self._slpin_ms = ticks_ms()
+        sleep_ms(5)  # datasheet: 5ms before the next command
+        self.write_sequence(self.INIT_SEQUENCE)
+        self.write_sequence(bytes([self.MADCTL, 1, self.ROTATE[rotation]]) +  # Memory access ctrl
+                            bytes([self.VSCRDEF, 6]) + ustruct.pack('>HHH', 0, self.height, 0))  # Vertical scrolling definition
+        self._sleep_out()
         self.write_cmd(self.DISPLAY_ON)  # Display on
-        sleep(.1)
         self.fill(0)
 
     def cleanup(self):
@@ -180,6 +230,24 @@ class Display(object):
         self.spi.deinit()
         print('display off')
 
+    def enable_stats(self, enabled=True):
+        """Enable or disable SPI traffic accounting per primitive.
+
+        Args:
+            enabled (bool): Wrap the primitives of this instance if True, unwrap them otherwise
+
+        Returns:
+            (SPIStats): The counters (see drivers/spi_stats.py), None if never enabled
+        """
+        if enabled:
+            if self.stats is None:
+                from drivers.spi_stats import SPIStats
+                self.stats = SPIStats(self)
+            self.stats.attach()
+        elif self.stats is not None:
+            self.stats.detach()
+        return self.stats
+
     def display_off(self):
         """Turn display off."""
         self.write_cmd(self.DISPLAY_OFF)
@@ -188,6 +256,65 @@ class Display(object):
         """Turn display on."""
         self.write_cmd(self.DISPLAY_ON)
 
+    def set_power_state(self, state, y1=0, y2=None):
+        """Switch the panel to a power state, GRAM is retained in all states.
+
+        Args:
+            state (int): POWER_NORMAL, POWER_IDLE, POWER_PARTIAL or POWER_SLEEP
+            y1 (Optional int): First panel row refreshed in POWER_PARTIAL (default 0)
+            y2 (Optional int): Last panel row refreshed in POWER_PARTIAL (default y1+19)
+
+        Panel rows are counted in frame memory (portrait, without rotation and scrolling).
+        """
+        if state == self.power_state and state != self.POWER_PARTIAL:
+            return
+        if state == self.POWER_SLEEP:
+            self.pwm.duty_u16(0)
+            self.write_cmd(self.DISPLAY_OFF)
+            self.write_cmd(self.SLPIN)
+            self._slpin_ms = ticks_ms()
+            self.power_state = state
+            return
+        if self.power_state == self.POWER_SLEEP:
+            # resume without re-initialization
+            self._sleep_out()
+            self.write_cmd(self.DISPLAY_ON)
+            self.pwm.duty_u16(self.brightness)
+        self.write_cmd(self.IDMON if state == self.POWER_IDLE else self.IDMOFF)
+        if state == self.POWER_PARTIAL:
+            if y2 is None:
+                y2 = y1 + 19
+            self.write_cmd(self.PTLAR, *ustruct.pack('>HH', y1, y2))
+            self.write_cmd(self.PTLON)
+        else:
+            self.write_cmd(self.NORON)
+        self.power_state = state
+
+    def set_frame_rate(self, state, rtna, diva=0):
+        """Set the frame rate the panel uses in a power state.
+
+        Args:
+            state (int): POWER_NORMAL, POWER_IDLE or POWER_PARTIAL
+            rtna (int): Clocks per line 0x10 (fastest) to 0x1F
+            diva (Optional int): Oscillator division 0 (fosc) to 3 (fosc/8)
+        """
+        self.frame_rates[state] = (diva, rtna)
+        self.write_cmd(self.FRAME_RATE_REGS[state], diva, rtna)
+
+    def frame_rate(self, state=None):
+        """Return the frame rate in Hz of a power state (default: the current one)."""
+        state = self.power_state if state is None else state
+        if state == self.POWER_SLEEP:
+            return 0
+        diva, rtna = self.frame_rates[state]
+        return 1898 // (rtna << diva)
+
+    def _sleep_out(self):
+        # datasheet: 120ms from reset/sleep in to sleep out
+        sleep_ms(max(0, 120 - ticks_diff(ticks_ms(), self._slpin_ms)))
+        self.write_cmd(self.SLPOUT)
+        sleep_ms(5)  # datasheet: 5ms before the next command
+
     def fill(self, c):
         """Fill display with the specified color."""
         self.fill_rect(0, 0, self.width, self.height, c)
@@ -195,17 +322,17 @@ class Display(object):
     def pixel(self, x, y, c=None):
         """Draw a single pixel with the specified color or return pixel color if c is not provided."""
         if c:
-            self.draw_chunk(c.to_bytes(2, 'big'), x, y, x, y)
+            self.draw_chunk(self._pattern(c, 1), x, y, x, y)
         else:
             return 1  # TODO
 
     def hline(self, x, y, w, c):
         """Draw a horizontal line."""
-        self.draw_chunk(c.to_bytes(2, 'big') * w, x, y, x+w-1, y)
+        self.draw_chunk(self._pattern(c, w), x, y, x+w-1, y)
 
     def vline(self, x, y, h, c):
         """Draw a vertical line."""
-        self.draw_chunk(c.to_bytes(2, 'big') * h, x, y, x, y+h-1)
+        self.draw_chunk(self._pattern(c, h), x, y, x, y+h-1)
 
     def line(self, x1, y1, x2, y2, c):
         """Draw a line."""
@@ -265,16 +392,24 @@ class Display(object):
         """Draw a filled rectangle."""
         chunk_height = 4  # rows of chunk buffer
         chunk_count, remainder = divmod(h, chunk_height)
-        chunk = c.to_bytes(2, 'big') * chunk_height * w
+        chunk = self._pattern(c, chunk_height * w)
 
-        for c in range(0, chunk_count):
+        for _ in range(chunk_count):
             self.draw_chunk(chunk, x, y, x+w-1, y+chunk_height-1)
             y += chunk_height
 
         if remainder:
-            chunk = c.to_bytes(2, 'big') * remainder * w
+            chunk = self._pattern(c, remainder * w)
             self.draw_chunk(chunk, x, y, x+w-1, y+remainder-1)
 
+    def _pattern(self, c, num_pixels):
+        """Return num_pixels pixels of color c, from the shared pattern buffer if there is one."""
+        if self.pattern is not None:
+            data = self.pattern.get(c, num_pixels * 2)
+            if data is not None:
+                return data
+        return c.to_bytes(2, 'big') * num_pixels
+
     def blit(self, fbuf, x, y, key=-1, palette=framebuf.RGB565):
         """Draw the contents of a framebuffer at the given coordinates."""
         if palette != framebuf.RGB565:
@@ -282,6 +417,149 @@ class Display(object):
 
         self.draw_chunk(fbuf.buffer, x, y, x+fbuf.width-1, y+fbuf.height-1)
 
+    def blit_region(self, fbuf, sx, sy, w, h, x, y):
+        """Draw the w*h region at sx,sy of a RGB565 framebuffer at the given coordinates."""
+        row_size = fbuf.stride * 2
+        if sx == 0 and w == fbuf.stride:
+            # rows are contiguous, send them straight from the framebuffer
+            data = memoryview(fbuf.buffer)[sy*row_size:(sy+h)*row_size]
+        else:
+            data = bytearray(w * h * 2)
+            src = memoryview(fbuf.buffer)
+            for row in range(h):
+                src_idx = (sy+row)*row_size + sx*2
+                data[row*w*2:(row+1)*w*2] = src[src_idx:src_idx+w*2]
+        self.draw_chunk(data, x, y, x+w-1, y+h-1)
+
+    def draw_image(self, path, x=0, y=0, width=None):
+        """Draw an image file, streamed in chunks through a small reusable buffer.
+
+        Supported are BMP (16-bit RGB565/RGB555 or 24-bit, bottom-up or top-down),
+        .spr (width byte, height byte, RGB565 big-endian) and raw RGB565 big-endian (any
+        other extension, width required).
+
+        Args:
+            path (str): Image file path
+            x (int): Left coordinate
+            y (int): Top coordinate
+            width (Optional int): Image width of raw files
+
+        Returns:
+            (int, int): Width and height of the image
+        """
+        with open(path, 'rb') as file:
+            if path.endswith('.bmp'):
+                return self._draw_bmp(file, x, y)
+            if path.endswith('.spr'):
+                w, h = file.read(2)
+                offset = 2
+            else:
+                if not width:
+                    raise ValueError(f'width required for raw image {path}')
+                w = width
+                h = file.seek(0, 2) // (w * 2)
+                offset = 0
+            self._draw_rows(file, x, y, w, h, offset, w * 2, False, None)
+            return w, h
+
+    def _draw_bmp(self, file, x, y):
+        header = file.read(54)
+        offset = ustruct.unpack_from('<I', header, 10)[0]
+        w, h = ustruct.unpack_from('<ii', header, 18)
+        bpp, compression = ustruct.unpack_from('<HI', header, 28)
+        if header[:2] != b'BM':
+            raise ValueError('not a BMP file')
+        bottom_up = h > 0
+        h = abs(h)
+        if bpp == 24 and compression == 0:
+            convert = self._convert_bgr888
+        elif bpp == 16 and compression == 3:
+            red_mask = ustruct.unpack('<I', file.read(4))[0]
+            convert = self._convert_rgb565_le if red_mask == 0xF800 else self._convert_rgb555_le
+        elif bpp == 16 and compression == 0:
+            convert = self._convert_rgb555_le
+        else:
+            raise NotImplementedError(f'{bpp}-bit BMP (compression {compression}) not supported.')
+        stride = (w * bpp // 8 + 3) & ~3  # rows are padded to 4 bytes
+        self._draw_rows(file, x, y, w, h, offset, stride, bottom_up, convert)
+        return w, h
+
+    def _draw_rows(self, file, x, y, w, h, offset, stride, bottom_up, convert):
+        """Stream h rows of w pixels (stride bytes each, starting at offset) from file to the display."""
+        if self._image_bufs is None:
+            self._image_bufs = (bytearray(self.image_buffer_size), bytearray(self.image_buffer_size))
+        out, raw = self._image_bufs
+        row_size = w * 2
+        rows_per_chunk = max(1, min(len(out) // row_size, len(raw) // stride))
+        if rows_per_chunk * row_size > len(out) or (convert is not None and stride > len(raw)):
+            raise ValueError(f'image rows too wide for image_buffer_size ({self.image_buffer_size})')
+        out_view = memoryview(out)
+        raw_view = memoryview(raw)
+        # one GRAM window for the whole image if it doesn't need to scroll or wrap
+        window = self.rotation != 0 or (
+            self.scroll_pos <= y and y + h <= self.scroll_pos + self.height and y % self.height + h <= self.height)
+        if window:
+            if x < 0 or y < 0 or x + w > self.width or (self.rotation != 0 and y + h > self.height):
+                return
+        try:
+            if window:
+                self._lock()
+                y1 = y % self.height
+                self.write_cmd(self.SET_COLUMN, *ustruct.pack('>HH', x, x + w - 1))
+                self.write_cmd(self.SET_PAGE, *ustruct.pack('>HH', y1, y1 + h - 1))
+                self.write_cmd(self.WRITE_RAM)
+            row = 0
+            while row < h:
+                rows = min(rows_per_chunk, h - row)
+                if bottom_up:
+                    file.seek(offset + (h - row - rows) * stride)
+                else:
+                    file.seek(offset + row * stride)
+                if convert is None:
+                    # stored in display format, read straight into the output buffer
+                    file.readinto(out_view[:rows * row_size])
+                else:
+                    file.readinto(raw_view[:rows * stride])
+                    for idx in range(rows):
+                        src_row = rows - 1 - idx if bottom_up else idx
+                        convert(raw, src_row * stride, out, idx * row_size, w)
+                if window:
+                    self.write_data(out_view[:rows * row_size])
+                else:
+                    self.draw_chunk(out_view[:rows * row_size], x, y + row, x + w - 1, y + row + rows - 1)
+                row += rows
+        finally:
+            if window:
+                self._unlock()
+
+    @staticmethod
+    def _convert_bgr888(src, src_idx, dst, dst_idx, w):
+        for _ in range(w):
+            c = (src[src_idx+2] & 0xF8) << 8 | (src[src_idx+1] & 0xFC) << 3 | src[src_idx] >> 3
+            dst[dst_idx] = c >> 8
+            dst[dst_idx+1] = c & 0xFF
+            src_idx += 3
+            dst_idx += 2
+
+    @staticmethod
+    def _convert_rgb565_le(src, src_idx, dst, dst_idx, w):
+        for _ in range(w):
+            dst[dst_idx] = src[src_idx+1]
+            dst[dst_idx+1] = src[src_idx]
+            src_idx += 2
+            dst_idx += 2
+
+    @staticmethod
+    def _convert_rgb555_le(src, src_idx, dst, dst_idx, w):
+        for _ in range(w):
+            v = src[src_idx] | src[src_idx+1] << 8
+            g = (v >> 5) & 0x1F
+            c = (v & 0x7C00) << 1 | (g << 1 | g >> 4) << 5 | (v & 0x1F)
+            dst[dst_idx] = c >> 8
+            dst[dst_idx+1] = c & 0xFF
+            src_idx += 2
+            dst_idx += 2
+
     def draw_chunk(self, data, x1, y1, x2, y2, key=-1):
         """Write a chunk of data to display.
             TODO: transparency with key
@@ -359,6 +637,20 @@ class Display(object):
             print(f'scroll_margins: top={top}, middle={middle}, bottom={bottom}')
             self.write_cmd(self.VSCRDEF, *ustruct.pack('>HHH', top, middle, bottom))
 
+    def is_configured(self):
+        """Return True if the panel is awake and configured like this driver would do it."""
+        mode = self.read_cmd(self.RDMODE, 1)[0]
+        if mode & 0x14 != 0x14:  # sleep out, display on
+            return False
+        madctl = self.read_cmd(self.RDMADCTL, 1)[0]
+        pixfmt = self.read_cmd(self.RDPIXFMT, 1)[0]
+        return madctl == self.ROTATE[self.rotation] and pixfmt == 0x55
+
+    def get_scanline(self):
+        """Return the panel line currently being refreshed (always 0 if the panel can't be read)."""
+        data = self.read_cmd(self.GET_SCANLINE, 2)
+        return ((data[0] & 0x03) << 8) | data[1]
+
     def get_info(self):
         """Get device information."""
         info = []
@@ -379,14 +671,57 @@ class Display(object):
         Args:
             brightness (int): Brightness between 0 and 0xFFFF.
         """
-        self.pwm.duty_u16(brightness)
+        self.brightness = brightness
+        if self.power_state != self.POWER_SLEEP:
+            self.pwm.duty_u16(brightness)
 
     def write_ram(self, data, x1, y1, x2, y2):
         """Write data to ram at column/page area defined by x/y coords."""
-        self.write_cmd(self.SET_COLUMN, *ustruct.pack('>HH', x1, x2))
-        self.write_cmd(self.SET_PAGE, *ustruct.pack('>HH', y1, y2))
-        self.write_cmd(self.WRITE_RAM)
-        self.write_data(data)
+        self._lock()
+        try:
+            # keep other devices off a shared bus for the whole burst
+            self.write_cmd(self.SET_COLUMN, *ustruct.pack('>HH', x1, x2))
+            self.write_cmd(self.SET_PAGE, *ustruct.pack('>HH', y1, y2))
+            self.write_cmd(self.WRITE_RAM)
+            self.write_data(data)
+        finally:
+            self._unlock()
+
+    def write_sequence(self, sequence):
+        """Write a table of commands (command, number of data bytes, data bytes, ...) in one pass."""
+        data = memoryview(sequence)
+        idx = transactions = command_bytes = data_bytes = 0
+        self._lock()
+        try:
+            # chip select stays low for the whole table
+            self.cs(0)
+            while idx < len(sequence):
+                num_bytes = sequence[idx + 1]
+                self.dc(0)
+                self.spi.write(data[idx:idx + 1])
+                if num_bytes:
+                    self.dc(1)
+                    self.spi.write(data[idx + 2:idx + 2 + num_bytes])
+                    transactions += 1
+                    data_bytes += num_bytes
+                idx += 2 + num_bytes
+                transactions += 1
+                command_bytes += 1
+            self.cs(1)
+        finally:
+            self._unlock()
+        if self.stats is not None:
+            # bypasses write_cmd/write_data
+            self.stats.account('write_sequence', transactions, command_bytes, data_bytes, 2)
+
+    def _lock(self):
+        """Lock a shared bus so other devices can't select themselves while the display is (nestable)."""
+        if self.shared_bus:
+            self.spi.lock()
+
+    def _unlock(self):
+        if self.shared_bus:
+            self.spi.unlock()
 
     def read_cmd(self, command, num_bytes):
         """Write command to OLED and read response.
@@ -395,12 +730,16 @@ class Display(object):
             command (byte): ILI9341 command code.
             num_bytes (int): Number of bytes to read.
         """
-        self.dc(0)
-        self.cs(0)
         buffer = bytearray(2 + num_bytes)
         buffer[0] = command
-        self.spi.write_readinto(buffer, buffer)
-        self.cs(1)
+        self._lock()
+        try:
+            self.dc(0)
+            self.cs(0)
+            self.spi.write_readinto(buffer, buffer)
+            self.cs(1)
+        finally:
+            self._unlock()
         return self._discard_bits(buffer[1:], 1)[:-1]
 
     def write_cmd(self, command, *args):
@@ -410,25 +749,33 @@ class Display(object):
             command (byte): ILI9341 command code.
             *args (optional bytes): Data to transmit.
         """
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([command]))
-        self.cs(1)
-        # handle any passed data
-        if len(args) > 0:
-            self.write_data(bytearray(args))
+        self._lock()
+        try:
+            self.dc(0)
+            self.cs(0)
+            self.spi.write(bytearray([command]))
+            self.cs(1)
+            # handle any passed data
+            if len(args) > 0:
+                self.write_data(bytearray(args))
+        finally:
+            self._unlock()
 
     def write_data(self, data):
         """Write data to OLED."""
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(data)
-        self.cs(1)
+        self._lock()
+        try:
+            self.dc(1)
+            self.cs(0)
+            self.spi.write(data)
+            self.cs(1)
+        finally:
+            self._unlock()
 
     def _discard_bits(self, data, num_bits):
         """Discard the first num_bits bits and shift the rest accordingly."""
         for idx in range(len(data)):
-            data[idx] = data[idx] << num_bits
+            data[idx] = (data[idx] << num_bits) & 0xFF
             if idx + 1 < len(data):
                 data[idx] |= data[idx + 1] >> (8 - num_bits)
         return data
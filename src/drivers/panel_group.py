@@ -0,0 +1,143 @@
+# Drives several ILI9341 panels on one SPI bus as a group.
+#
+# - All panels share one pattern buffer for fills (no per-call allocations).
+# - Dirty regions of all panels are flushed in bands, round-robin, so every
+#   panel makes progress at the same rate.
+# - Identical content (fills, splash screens) is broadcast: all chip select
+#   lines are asserted at once and the data is sent only once.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import ustruct
+
+
+class PatternBuffer(object):
+    """Reusable buffer filled with a repeated RGB565 color."""
+
+    def __init__(self, size):
+        """Initialize pattern buffer.
+
+        Args:
+            size (int): Buffer size in bytes
+        """
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.color = -1
+        self.filled = 0  # bytes holding the pattern of color
+
+    def get(self, color, num_bytes):
+        """Return num_bytes of the color pattern (None if the buffer is too small)."""
+        if num_bytes > len(self.buffer):
+            return None
+        view = self.view
+        if color != self.color:
+            self.color = color
+            view[0] = color >> 8
+            view[1] = color & 0xFF
+            self.filled = 2
+        # double the pattern until it is long enough
+        while self.filled < num_bytes:
+            size = min(self.filled, len(self.buffer) - self.filled)
+            view[self.filled:self.filled + size] = view[:size]
+            self.filled += size
+        return view[:num_bytes]
+
+
+class PanelGroup(object):
+    """Group of Display instances sharing one SPI bus."""
+
+    def __init__(self, displays, band_height=16):
+        """Initialize panel group.
+
+        Args:
+            displays (list): Display instances on the same SPI bus (same size and rotation for broadcasts)
+            band_height (Optional int): Rows written per panel and round when flushing (default 16)
+        """
+        self.displays = displays
+        self.band_height = band_height
+        lead = displays[0]
+        self.pattern = PatternBuffer(max(lead.width, lead.height) * 4 * 2)
+        for display in displays:
+            display.pattern = self.pattern
+        self._queues = [[] for _ in displays]  # bands per panel: [fbuf, sx, sy, w, h, x, y]
+
+    def queue(self, index, fbuf, rects, x=0, y=0):
+        """Queue the x,y,w,h rects of a RGB565 framebuffer for panel index, offset by x,y."""
+        queue = self._queues[index]
+        band_height = self.band_height
+        for sx, sy, w, h in rects:
+            for offset in range(0, h, band_height):
+                queue.append([fbuf, sx, sy + offset, w, min(band_height, h - offset), x + sx, y + sy + offset])
+
+    def flush(self):
+        """Write all queued bands, one band per panel and round."""
+        queues = self._queues
+        pos = [0] * len(queues)
+        pending = True
+        while pending:
+            pending = False
+            for index, queue in enumerate(queues):
+                if pos[index] < len(queue):
+                    fbuf, sx, sy, w, h, x, y = queue[pos[index]]
+                    self.displays[index].blit_region(fbuf, sx, sy, w, h, x, y)
+                    pos[index] += 1
+                    pending = True
+        for queue in queues:
+            queue.clear()
+
+    def fill(self, c):
+        """Fill all panels with the specified color."""
+        lead = self.displays[0]
+        self.fill_rect(0, 0, lead.width, lead.height, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        """Draw a filled rectangle on all panels at once (y is a frame memory row, scrolling is ignored)."""
+        rows = max(1, len(self.pattern.buffer) // (w * 2))
+        self._broadcast(x, y, x + w - 1, y + h - 1, self._fill_chunks(c, w, h, rows))
+
+    def blit(self, fbuf, x, y):
+        """Draw the contents of a RGB565 framebuffer on all panels at once."""
+        self._broadcast(x, y, x + fbuf.width - 1, y + fbuf.height - 1, (fbuf.buffer,))
+
+    def _fill_chunks(self, c, w, h, rows):
+        for _ in range(h // rows):
+            yield self.pattern.get(c, rows * w * 2)
+        if h % rows:
+            yield self.pattern.get(c, (h % rows) * w * 2)
+
+    def _broadcast(self, x1, y1, x2, y2, chunks):
+        lead = self.displays[0]
+        if lead.shared_bus:
+            lead.spi.lock()
+        try:
+            for display in self.displays:
+                display.cs(0)
+            self._command(lead.SET_COLUMN, ustruct.pack('>HH', x1, x2))
+            self._command(lead.SET_PAGE, ustruct.pack('>HH', y1, y2))
+            self._command(lead.WRITE_RAM, None)
+            transactions = 5  # 3 commands, 2 window parameters
+            data_bytes = 8
+            for chunk in chunks:
+                lead.spi.write(chunk)
+                transactions += 1
+                data_bytes += len(chunk)
+        finally:
+            for display in self.displays:
+                display.cs(1)
+            if lead.shared_bus:
+                lead.spi.unlock()
+        # bypasses write_cmd/write_data, every panel received the whole transfer
+        for display in self.displays:
+            if display.stats is not None:
+                display.stats.account('broadcast', transactions, 3, data_bytes, 2)
+
+    def _command(self, command, data):
+        # chip selects are already asserted, only toggle data/command
+        for display in self.displays:
+            display.dc(0)
+        self.displays[0].spi.write(bytes((command,)))
+        for display in self.displays:
+            display.dc(1)
+        if data:
+            self.displays[0].spi.write(data)
@@ -0,0 +1,129 @@
+# Shares one SPI bus between several devices (e.g. display and touch controller).
+#
+# - Switches the baudrate only when another device takes over the bus.
+# - Devices lock the bus for their transfers (or a burst of them), another
+#   device that wants the bus meanwhile (e.g. from an interrupt) defers its
+#   transfer until the bus is unlocked. Every device has one deferred slot,
+#   so deferring doesn't allocate.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+
+class SPIBus(object):
+    """SPI bus arbiter."""
+
+    def __init__(self, spi):
+        """Initialize SPI bus arbiter.
+
+        Args:
+            spi (Class Spi):  SPI interface shared by all devices
+        """
+        self.spi = spi
+        self.owner = None  # device the bus is currently configured for
+        self.switches = 0  # number of baudrate switches
+        self._lock_owner = None
+        self._lock_depth = 0
+        self._devices = []  # active devices
+
+    def device(self, baudrate, **kwargs):
+        """Return a device handle that can be used like a machine.SPI.
+
+        Args:
+            baudrate (int): Baudrate of the device
+            kwargs: Additional arguments passed to SPI.init (e.g. polarity, phase)
+        """
+        device = SPIDevice(self, baudrate, kwargs)
+        self._devices.append(device)
+        return device
+
+    def select(self, device):
+        """Configure the bus for device if it isn't already."""
+        if self.owner is not device:
+            self.spi.init(baudrate=device.baudrate, **device.kwargs)
+            self.owner = device
+            self.switches += 1
+
+    def busy(self, device):
+        """Return True if the bus is locked by another device."""
+        return self._lock_depth > 0 and self._lock_owner is not device
+
+    def lock(self, device):
+        """Lock the bus for device (nestable)."""
+        if self.busy(device):
+            raise RuntimeError('SPI bus is locked by another device.')
+        self._lock_owner = device
+        self._lock_depth += 1
+
+    def unlock(self, device):
+        """Unlock the bus and run the deferred transfers of other devices."""
+        if self._lock_depth > 0 and self._lock_owner is device:
+            self._lock_depth -= 1
+        if self._lock_depth == 0:
+            self._lock_owner = None
+            for device in self._devices:
+                callback = device.deferred
+                if callback is not None:
+                    device.deferred = None
+                    callback()
+
+    def release(self, device):
+        """Deinitialize the bus once all devices are deinitialized."""
+        if device in self._devices:
+            self._devices.remove(device)
+        if not self._devices:
+            self.spi.deinit()
+
+
+class SPIDevice(object):
+    """Device handle on a shared SPI bus, implements the machine.SPI transfer methods."""
+
+    def __init__(self, bus, baudrate, kwargs):
+        self.bus = bus
+        self.baudrate = baudrate
+        self.kwargs = kwargs
+        self.active = True
+        self.deferred = None  # callback run when the bus gets unlocked
+
+    @property
+    def busy(self):
+        """True while another device holds the bus lock."""
+        return self.bus.busy(self)
+
+    def lock(self):
+        self.bus.lock(self)
+
+    def unlock(self):
+        self.bus.unlock(self)
+
+    def defer(self, callback):
+        """Run callback when the bus gets unlocked (once, even if deferred repeatedly, no allocation)."""
+        self.deferred = callback
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate is not None:
+            self.baudrate = baudrate
+        self.kwargs.update(kwargs)
+        if self.bus.owner is self:
+            self.bus.owner = None  # reconfigure on next transfer
+
+    def deinit(self):
+        if self.active:
+            self.active = False
+            self.bus.release(self)
+
+    def write(self, buf):
+        self.bus.select(self)
+        self.bus.spi.write(buf)
+
+    def read(self, nbytes, write=0x00):
+        self.bus.select(self)
+        return self.bus.spi.read(nbytes, write)
+
+    def readinto(self, buf, write=0x00):
+        self.bus.select(self)
+        self.bus.spi.readinto(buf, write)
+
+    def write_readinto(self, write_buf, read_buf):
+        self.bus.select(self)
+        self.bus.spi.write_readinto(write_buf, read_buf)
@@ -0,0 +1,159 @@
+# Opt-in SPI traffic accounting for the ILI9341 display driver.
+#
+# - Wraps the primitives of one Display instance (the class stays untouched,
+#   so there is no overhead while accounting is disabled). The wrappers look
+#   up the class method on every call, so class level hooks like the ones of
+#   diagnostics/profiler.py keep working and are never captured.
+# - Counts calls, SPI transactions, command bytes, data bytes and CS toggles
+#   per primitive. Nested calls (e.g. fill -> fill_rect -> draw_chunk) are
+#   accounted to the outermost primitive.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+
+class SPIStats(object):
+    """SPI traffic counters of a Display, aggregated per primitive name."""
+
+    PRIMITIVES = ('fill', 'pixel', 'hline', 'vline', 'line', 'rect', 'fill_rect', 'blit', 'blit_region',
+                  'draw_chunk', 'draw_image', 'write_ram', 'scroll', 'scroll_abs', 'set_scroll_margins', 'get_info',
+                  'display_on', 'display_off')
+    OTHER = 'other'  # name for transfers outside of any primitive
+
+    # counter indices
+    CALLS = const(0)
+    TRANSACTIONS = const(1)
+    COMMAND_BYTES = const(2)
+    DATA_BYTES = const(3)
+    CS_TOGGLES = const(4)
+
+    def __init__(self, display):
+        """Initialize SPI traffic accounting.
+
+        Args:
+            display (Display): Display instance to account for
+        """
+        self.display = display
+        self.counters = {}  # name: [calls, transactions, command bytes, data bytes, cs toggles]
+        self.attached = False
+        self._current = None  # counters of the outermost running primitive
+
+    def attach(self):
+        """Start accounting by wrapping the primitives of the display instance."""
+        if self.attached:
+            return
+        display = self.display
+        for name in self.PRIMITIVES:
+            setattr(display, name, self._wrap_primitive(name))
+        display.write_cmd = self._wrap_write_cmd()
+        display.write_data = self._wrap_write_data()
+        display.read_cmd = self._wrap_read_cmd()
+        self.attached = True
+
+    def detach(self):
+        """Stop accounting, the display falls back to its class methods."""
+        if not self.attached:
+            return
+        display = self.display
+        for name in self.PRIMITIVES + ('write_cmd', 'write_data', 'read_cmd'):
+            delattr(display, name)
+        self.attached = False
+        self._current = None
+
+    def reset(self):
+        """Reset all counters."""
+        self.counters = {}
+
+    def account(self, name, transactions, command_bytes, data_bytes, cs_toggles):
+        """Add one call of traffic that was sent without write_cmd/write_data (e.g. PanelGroup broadcasts)."""
+        if not self.attached:
+            return
+        counters = self._counters(name)
+        counters[self.CALLS] += 1
+        counters[self.TRANSACTIONS] += transactions
+        counters[self.COMMAND_BYTES] += command_bytes
+        counters[self.DATA_BYTES] += data_bytes
+        counters[self.CS_TOGGLES] += cs_toggles
+
+    def get(self, name):
+        """Return the counters of a primitive as a dict."""
+        counters = self.counters.get(name, [0, 0, 0, 0, 0])
+        return {
+            'calls': counters[self.CALLS],
+            'transactions': counters[self.TRANSACTIONS],
+            'command_bytes': counters[self.COMMAND_BYTES],
+            'data_bytes': counters[self.DATA_BYTES],
+            'cs_toggles': counters[self.CS_TOGGLES],
+        }
+
+    def report(self):
+        """Return the counters as a table, sorted by the number of transferred bytes."""
+        lines = [f'{"primitive":<18} {"calls":>7} {"trans":>7} {"cmd":>7} {"data":>9} {"cs":>7}']
+        rows = sorted(self.counters.items(),
+                      key=lambda item: item[1][self.COMMAND_BYTES] + item[1][self.DATA_BYTES], reverse=True)
+        for name, counters in rows:
+            calls, transactions, command_bytes, data_bytes, cs_toggles = counters
+            lines.append(f'{name:<18} {calls:>7} {transactions:>7} {command_bytes:>7} {data_bytes:>9} {cs_toggles:>7}')
+        return '\n'.join(lines)
+
+    def _counters(self, name):
+        counters = self.counters.get(name)
+        if counters is None:
+            counters = self.counters[name] = [0, 0, 0, 0, 0]
+        return counters
+
+    def _active(self):
+        return self._current or self._counters(self.OTHER)
+
+    def _wrap_primitive(self, name):
+        display = self.display
+        cls = type(display)
+
+        def wrapper(*args, **kwargs):
+            method = getattr(cls, name)
+            if self._current is not None:
+                return method(display, *args, **kwargs)
+            counters = self._current = self._counters(name)
+            counters[self.CALLS] += 1
+            try:
+                return method(display, *args, **kwargs)
+            finally:
+                self._current = None
+        return wrapper
+
+    def _wrap_write_cmd(self):
+        display = self.display
+        cls = type(display)
+
+        def wrapper(command, *args):
+            counters = self._active()
+            counters[self.TRANSACTIONS] += 1
+            counters[self.COMMAND_BYTES] += 1
+            counters[self.CS_TOGGLES] += 2
+            return cls.write_cmd(display, command, *args)  # parameters are accounted by write_data
+        return wrapper
+
+    def _wrap_write_data(self):
+        display = self.display
+        cls = type(display)
+
+        def wrapper(data):
+            counters = self._active()
+            counters[self.TRANSACTIONS] += 1
+            counters[self.DATA_BYTES] += len(data)
+            counters[self.CS_TOGGLES] += 2
+            return cls.write_data(display, data)
+        return wrapper
+
+    def _wrap_read_cmd(self):
+        display = self.display
+        cls = type(display)
+
+        def wrapper(command, num_bytes):
+            counters = self._active()
+            counters[self.TRANSACTIONS] += 1
+            counters[self.COMMAND_BYTES] += 1
+            counters[self.DATA_BYTES] += num_bytes + 1  # response plus dummy byte
+            counters[self.CS_TOGGLES] += 2
+            return cls.read_cmd(display, command, num_bytes)
+        return wrapper
@@ -0,0 +1,131 @@
+# asyncio touch event stream for the XPT2046 driver.
+#
+# Usage:
+#   stream = TouchStream(touch)
+#   stream.start()
+#   async for event, x, y in stream:
+#       ...
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+from array import array
+
+import uasyncio as asyncio
+
+EVENT_DOWN = const(0)
+EVENT_MOVE = const(1)
+EVENT_UP = const(2)
+
+
+class TouchStream(object):
+    """Polls a Touch at a fixed rate and queues down/move/up events.
+
+    While the touch is polled the sampling in the touch interrupt is disabled.
+    If the consumer falls behind, queued move events are coalesced into
+    the newest one, down/up events are only dropped if the queue is full.
+    """
+
+    def __init__(self, touch, rate_hz=60, queue_size=8, move_threshold=2):
+        """Initialize touch stream.
+
+        Args:
+            touch (Class Touch):  Touch controller driver
+            rate_hz (int): Samples per second while polling
+            queue_size (int): Max. number of queued events
+            move_threshold (int): Min. distance in pixels for a move event
+        """
+        self.touch = touch
+        self.period_ms = 1000 // rate_hz
+        self.move_threshold = move_threshold
+        self.queue_size = queue_size
+        self._types = bytearray(queue_size)
+        self._xs = array('H', [0] * queue_size)
+        self._ys = array('H', [0] * queue_size)
+        self._head = 0  # next write position
+        self._count = 0
+        self.dropped = 0  # events lost because the queue was full
+        self.coalesced = 0  # move events merged into a newer one
+        self._event = asyncio.Event()
+        self._task = None
+        self._down = False
+        self._x = 0
+        self._y = 0
+
+    def start(self):
+        """Start the polling task."""
+        if self._task is None:
+            self.touch.set_irq(False)
+            self._task = asyncio.create_task(self._poll())
+        return self
+
+    def stop(self):
+        """Stop the polling task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.touch.set_irq(True)
+
+    def pending(self):
+        """Return number of queued events."""
+        return self._count
+
+    def get_nowait(self):
+        """Return the oldest queued (event, x, y) or None."""
+        if not self._count:
+            return None
+        idx = (self._head - self._count) % self.queue_size
+        self._count -= 1
+        return (self._types[idx], self._xs[idx], self._ys[idx])
+
+    async def get(self):
+        """Wait for and return the next (event, x, y)."""
+        while not self._count:
+            self._event.clear()
+            await self._event.wait()
+        return self.get_nowait()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    async def _poll(self):
+        touch = self.touch
+        # without int_pin pen_down() takes the sample itself
+        sampled = touch.int_pin is None
+        while True:
+            if not touch.pen_down():
+                if self._down:
+                    self._down = False
+                    self._push(EVENT_UP, self._x, self._y)
+            elif sampled or touch.sample():
+                x, y = touch.normalize(touch.sample_x, touch.sample_y)
+                if not self._down:
+                    self._down = True
+                    self._push(EVENT_DOWN, x, y)
+                elif abs(x - self._x) >= self.move_threshold or abs(y - self._y) >= self.move_threshold:
+                    self._push(EVENT_MOVE, x, y)
+            # else the sample was rejected by the filter while the pen stays down, skip it
+            await asyncio.sleep_ms(self.period_ms)
+
+    def _push(self, event, x, y):
+        self._x = x
+        self._y = y
+        size = self.queue_size
+        if event == EVENT_MOVE and self._count and self._types[(self._head - 1) % size] == EVENT_MOVE:
+            # consumer is behind, replace the queued move with the newer one
+            idx = (self._head - 1) % size
+            self.coalesced += 1
+        else:
+            idx = self._head
+            self._head = (self._head + 1) % size
+            if self._count == size:
+                self.dropped += 1  # overwrite the oldest
+            else:
+                self._count += 1
+        self._types[idx] = event
+        self._xs[idx] = x
+        self._ys[idx] = y
+        self._event.set()
@@ -1,6 +1,8 @@
 # A minimalistic but smart XPT2046 touch screen controller driver.
 #
-# Recalibrates automagically during usage.
+# Recalibrates automagically during usage, unless a 3-point calibration
+# was stored (see Touch.calibrate).
+# Samples are taken in the interrupt and delivered later (see Touch.poll).
 #
 # If YOU have improvements please open issue or merge-request here https://github.com/ChrisDeadman/ili9341-driver-micropython
 # or post somewhere in case I'm gone.
@@ -8,7 +10,14 @@
 # MIT License; Copyright (c) 2022 Christopher Hubmann
 #
 
+from array import array
+
+import micropython
+import ustruct
 from machine import Pin
+from utime import ticks_ms
+
+micropython.alloc_emergency_exception_buf(100)
 
 
 class Touch(object):
@@ -24,13 +33,30 @@ class Touch(object):
     GET_BATTERY = const(0b10100000)  # Battery monitor
     GET_AUX = const(0b11100000)  # Auxiliary input to ADC
 
+    # Affine calibration coefficients are fixed-point numbers with this many fraction bits
+    CAL_SHIFT = const(16)
+    CAL_MAGIC = b'TCAL'
+    CAL_FORMAT = '<4s6i'
+
+    # Mapping of rotation=0 screen coordinates to rotated screen coordinates
+    # as (m00, m01, m10, m11, tx, ty), tx/ty are multiples of (width-1, height-1)
+    ROTATE = {
+        0: (1, 0, 0, 1, (0, 0), (0, 0)),
+        90: (0, 1, -1, 0, (0, 0), (1, 0)),
+        180: (-1, 0, 0, -1, (1, 0), (0, 1)),
+        270: (0, -1, 1, 0, (0, 1), (0, 0)),
+    }
+
     def __init__(self, spi, cs, int_pin=None, int_handler=None,
                  width=240, height=320,
-                 x_min=100, x_max=1962, y_min=1900, y_max=100):
+                 x_min=100, x_max=1962, y_min=1900, y_max=100,
+                 buffer_size=16, schedule=True,
+                 samples=1, min_pressure=200, max_spread=100,
+                 rotation=0, calibration_file='/touch_calibration.dat'):
         """Initialize XPT2046 touch screen controller.
 
         Args:
-            spi (Class Spi):  SPI interface for OLED
+            spi (Class Spi):  SPI interface for OLED (or a device of a shared SPIBus)
             cs (Class Pin):  Chip select pin
             int_pin (Class Pin):  Touch controller interrupt pin
             int_handler (function): Handler for screen interrupt
@@ -40,8 +66,16 @@ class Touch(object):
             x_max (int): Maximum x coordinate (exchange x_min and x_max if inverted)
             y_min (int): Minimum Y coordinate
             y_max (int): Maximum Y coordinate (exchange y_min and y_max if inverted)
+            buffer_size (int): Number of raw samples buffered between interrupt and delivery (power of 2)
+            schedule (bool): Deliver samples to int_handler via micropython.schedule, else call poll()
+            samples (int): Conversions per axis and touch, >1 reads X/Y/Z1/Z2 in one filtered transfer
+            min_pressure (int): Touches with lower pressure are rejected (only if samples > 1)
+            max_spread (int): Touches with a higher X or Y spread are rejected (only if samples > 1)
+            rotation (int): Display rotation, used to map calibrated coordinates (0, 90, 180 or 270)
+            calibration_file (str): Load a 3-point calibration from this file if it exists
         """
         self.spi = spi
+        self.shared_bus = hasattr(spi, 'defer')  # see drivers/spi_bus.py
         self.cs = cs
         self.cs.init(self.cs.OUT, value=1)
         self.rx_buf = bytearray(3)  # Receive buffer
@@ -49,6 +83,22 @@ class Touch(object):
         self.width = width
         self.height = height
 
+        # multi-sample mode: N interleaved X,Y,Z1,Z2 conversions chained in one transfer,
+        # each command overlaps the last result byte of the previous one (16 clocks per conversion)
+        self.samples = samples
+        self.min_pressure = min_pressure
+        self.max_spread = max_spread
+        self.pressure = 0  # pressure of the last sample (only if samples > 1)
+        self.sample_x = 0  # raw X of the last sample
+        self.sample_y = 0  # raw Y of the last sample
+        if samples > 1:
+            commands = (self.GET_X, self.GET_Y, self.GET_Z1, self.GET_Z2)
+            self.chain_tx_buf = bytearray(2 * len(commands) * samples + 1)
+            self.chain_rx_buf = bytearray(len(self.chain_tx_buf))
+            for idx in range(len(commands) * samples):
+                self.chain_tx_buf[2 * idx] = commands[idx % len(commands)]
+            self._filter_buf = array('H', [0] * samples)
+
         # initialize calibration
         self.x_inverted = x_min > x_max
         if self.x_inverted:
@@ -68,36 +118,211 @@ class Touch(object):
 
         self.recalibrate(self.x_min, self.y_max, force=True)
 
+        # fixed-point 3-point calibration (rotation=0 and rotated by set_rotation)
+        self.calibration = None
+        self._affine = None
+        self.calibration_file = calibration_file
+        self.set_rotation(rotation)
+        if calibration_file:
+            self.load_calibration(calibration_file)
+
+        # ring buffer of timestamped raw samples, written by the interrupt
+        if buffer_size & (buffer_size - 1):
+            raise ValueError('buffer_size must be a power of 2.')
+        self._ring_mask = buffer_size - 1
+        self._ring_x = array('H', [0] * buffer_size)
+        self._ring_y = array('H', [0] * buffer_size)
+        self._ring_t = array('L', [0] * buffer_size)
+        self._ring_head = 0  # next write position
+        self._ring_tail = 0  # next read position
+        self.dropped = 0  # samples lost because the buffer was full
+        self.last_event_ms = 0  # timestamp of the last delivered sample
+
         # setup interrupt handling
         self.int_handler = int_handler
+        self.schedule = schedule
+        self._scheduled = False
+        self._dispatch_ref = self._dispatch  # avoid allocating a bound method in the interrupt
+        self._deferred_sample_ref = self._deferred_sample
+        self.int_pin = int_pin
         if int_pin is not None:
             int_pin.init(Pin.IN, Pin.PULL_UP)
-            int_pin.irq(trigger=Pin.IRQ_FALLING, handler=self._int_handler)
+        self.set_irq(True)
+
+    def set_irq(self, enabled):
+        """Enable or disable sampling in the touch interrupt."""
+        if self.int_pin is not None:
+            self.int_pin.irq(trigger=Pin.IRQ_FALLING, handler=self._int_handler if enabled else None)
+
+    def pen_down(self):
+        """Return True while the screen is touched (needs int_pin, else tries a sample)."""
+        if self.int_pin is not None:
+            return not self.int_pin.value()
+        return self.sample()
 
     def _int_handler(self, pin):
-        """Touch interrupt handler."""
+        """Touch interrupt handler, only stores a raw sample (no allocation)."""
         if not pin.value():
-            buff = self.raw_touch()
-            if buff is not None and self.int_handler:
-                x, y = self.normalize(*buff)
-                self.int_handler(x, y)
+            if self.shared_bus and self.spi.busy:
+                # don't interrupt a display burst, sample when the bus is free
+                self.spi.defer(self._deferred_sample_ref)
+            else:
+                self._buffer_sample()
+
+    def _deferred_sample(self):
+        if self.pen_down():
+            self._buffer_sample()
+
+    def _buffer_sample(self):
+        """Read a sample into the ring buffer and schedule delivery."""
+        if self.sample():
+            head = self._ring_head
+            self._ring_x[head] = self.sample_x
+            self._ring_y[head] = self.sample_y
+            self._ring_t[head] = ticks_ms()
+            head = (head + 1) & self._ring_mask
+            if head == self._ring_tail:
+                # full, drop the oldest sample
+                self._ring_tail = (head + 1) & self._ring_mask
+                self.dropped += 1
+            self._ring_head = head
+            if self.schedule and not self._scheduled:
+                self._scheduled = True
+                try:
+                    micropython.schedule(self._dispatch_ref, None)
+                except RuntimeError:
+                    self._scheduled = False  # schedule queue full, retry on next interrupt
+
+    def _dispatch(self, _):
+        """Deliver pending samples to int_handler (runs outside of the interrupt)."""
+        self._scheduled = False
+        self.dispatch()
+
+    def dispatch(self):
+        """Deliver the newest pending sample to int_handler, returns True if there was one."""
+        event = self.poll()
+        if event is None:
+            return False
+        if self.int_handler:
+            self.int_handler(*event)
+        return True
+
+    def pending(self):
+        """Return number of buffered raw samples."""
+        return (self._ring_head - self._ring_tail) & self._ring_mask
+
+    def poll(self):
+        """Return normalized X,Y of the newest buffered sample or None.
+
+        Older pending samples are dropped (move events are coalesced).
+        """
+        raw = self.poll_raw()
+        if raw is None:
+            return None
+        return self.normalize(*raw)
+
+    def poll_raw(self):
+        """Return raw X,Y of the newest buffered sample or None (see poll)."""
+        head = self._ring_head
+        if head == self._ring_tail:
+            return None
+        newest = (head - 1) & self._ring_mask
+        self._ring_tail = head
+        self.last_event_ms = self._ring_t[newest]
+        return (self._ring_x[newest], self._ring_y[newest])
 
     def raw_touch(self):
-        """Read raw X,Y touch values."""
-        x = self.send_command(self.GET_X)
-        y = self.send_command(self.GET_Y)
-        return (x, y)
+        """Read raw X,Y touch values or None if the touch was rejected."""
+        if not self.sample():
+            return None
+        return (self.sample_x, self.sample_y)
+
+    def sample(self):
+        """Read raw X,Y into sample_x and sample_y (no allocation).
+
+        Returns:
+            False if the touch was too light or bouncing (only if samples > 1).
+        """
+        if self.samples <= 1:
+            self.sample_x = self.send_command(self.GET_X)
+            self.sample_y = self.send_command(self.GET_Y)
+            return True
+
+        self._lock()
+        try:
+            self.cs(0)
+            self.spi.write_readinto(self.chain_tx_buf, self.chain_rx_buf)
+            self.cs(1)
+        finally:
+            self._unlock()
+        x = self._filter(0)
+        if self._spread > self.max_spread:
+            return False
+        y = self._filter(1)
+        if self._spread > self.max_spread:
+            return False
+        # pressure rises with Z1 and falls with Z2, both are 0/max without a touch
+        self.pressure = self._filter(2) + 0x7FF - self._filter(3)
+        if self.pressure < self.min_pressure:
+            return False
+        self.sample_x = x
+        self.sample_y = y
+        return True
+
+    def _filter(self, channel):
+        """Return trimmed mean of all conversions of a channel of the chained transfer."""
+        values = self.chain_rx_buf
+        buf = self._filter_buf
+        n = self.samples
+        # insertion sort into the preallocated buffer
+        for idx in range(n):
+            pos = 8 * idx + 2 * channel
+            value = ((values[pos + 1] << 8) | values[pos + 2]) >> 4
+            j = idx
+            while j > 0 and buf[j - 1] > value:
+                buf[j] = buf[j - 1]
+                j -= 1
+            buf[j] = value
+        self._spread = buf[n - 1] - buf[0]
+        # median for up to 3 samples, mean without lowest/highest quarter above
+        trim = n // 4 if n >= 4 else (n - 1) // 2
+        total = 0
+        for idx in range(trim, n - trim):
+            total += buf[idx]
+        return total // (n - 2 * trim)
 
     def send_command(self, command):
         """Write command to XT2046."""
         self.tx_buf[0] = command
-        self.cs(0)
-        self.spi.write_readinto(self.tx_buf, self.rx_buf)
-        self.cs(1)
+        self._lock()
+        try:
+            self.cs(0)
+            self.spi.write_readinto(self.tx_buf, self.rx_buf)
+            self.cs(1)
+        finally:
+            self._unlock()
         return (self.rx_buf[1] << 4) | (self.rx_buf[2] >> 4)
 
+    def _lock(self):
+        """Lock a shared bus so the display can't select itself during a transfer (nestable)."""
+        if self.shared_bus:
+            self.spi.lock()
+
+    def _unlock(self):
+        if self.shared_bus:
+            self.spi.unlock()
+
     def normalize(self, x, y):
         """Normalize mean X,Y values to match LCD screen."""
+        affine = self._affine
+        if affine is not None:
+            # integer only, no float allocation
+            a, b, c, d, e, f = affine
+            sx = (a * x + b * y + c) >> self.CAL_SHIFT
+            sy = (d * x + e * y + f) >> self.CAL_SHIFT
+            return (min(max(sx, 0), self.screen_width - 1),
+                    min(max(sy, 0), self.screen_height - 1))
+
         self.recalibrate(x, y)  # auto recalibration
 
         x = (x - self.x_min) * self.x_multiplier
@@ -130,3 +355,97 @@ class Touch(object):
             self.y_multiplier = self.height / (self.y_max - self.y_min)
 
         return changed
+
+    def set_rotation(self, rotation):
+        """Set display rotation the calibrated coordinates are mapped to."""
+        if rotation not in self.ROTATE.keys():
+            raise ValueError('Rotation must be 0, 90, 180 or 270.')
+        self.rotation = rotation
+        if rotation in (90, 270):
+            self.screen_width, self.screen_height = self.height, self.width
+        else:
+            self.screen_width, self.screen_height = self.width, self.height
+        self._apply_calibration()
+
+    def calibrate(self, points):
+        """Calculate affine calibration from 3 touches (compensates rotation and skew).
+
+        Args:
+            points ([[int, int, int, int],...]): 3x raw X, raw Y, screen X, screen Y
+                (screen coordinates for the current rotation)
+        """
+        if len(points) != 3:
+            raise ValueError('Calibration needs exactly 3 points.')
+        # solve screen = A * raw + t for rotation=0 coordinates
+        m00, m01, m10, m11, tx, ty = self._rotate_params()
+        rows = []
+        sx = []
+        sy = []
+        for raw_x, raw_y, x, y in points:
+            rows.append((raw_x, raw_y, 1))
+            # inverse rotation (transposed matrix)
+            sx.append(m00 * (x - tx) + m10 * (y - ty))
+            sy.append(m01 * (x - tx) + m11 * (y - ty))
+        det = self._det3(rows)
+        if det == 0:
+            raise ValueError('Calibration points must not be on one line.')
+        coefficients = []
+        for target in (sx, sy):
+            for col in range(3):
+                replaced = [list(row) for row in rows]
+                for idx in range(3):
+                    replaced[idx][col] = target[idx]
+                coefficients.append(round(self._det3(replaced) * (1 << self.CAL_SHIFT) / det))
+        self.calibration = tuple(coefficients)
+        self._apply_calibration()
+
+    def clear_calibration(self):
+        """Return to min/max auto-recalibration."""
+        self.calibration = None
+        self._apply_calibration()
+
+    def load_calibration(self, path):
+        """Load calibration from a file, returns False if it doesn't exist or is invalid."""
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return False
+        if len(data) != ustruct.calcsize(self.CAL_FORMAT):
+            return False
+        values = ustruct.unpack(self.CAL_FORMAT, data)
+        if values[0] != self.CAL_MAGIC:
+            return False
+        self.calibration = values[1:]
+        self._apply_calibration()
+        return True
+
+    def save_calibration(self, path=None):
+        """Store calibration in a file (defaults to calibration_file)."""
+        with open(path or self.calibration_file, 'wb') as file:
+            file.write(ustruct.pack(self.CAL_FORMAT, self.CAL_MAGIC, *self.calibration))
+
+    def _rotate_params(self):
+        m00, m01, m10, m11, tx, ty = self.ROTATE[self.rotation]
+        tx = tx[0] * (self.width - 1) + tx[1] * (self.height - 1)
+        ty = ty[0] * (self.width - 1) + ty[1] * (self.height - 1)
+        return m00, m01, m10, m11, tx, ty
+
+    def _apply_calibration(self):
+        if self.calibration is None:
+            self._affine = None
+            return
+        # compose the rotation=0 calibration with the rotation mapping
+        a, b, c, d, e, f = self.calibration
+        m00, m01, m10, m11, tx, ty = self._rotate_params()
+        half = 1 << (self.CAL_SHIFT - 1)  # round to nearest pixel
+        self._affine = (
+            m00 * a + m01 * d, m00 * b + m01 * e, m00 * c + m01 * f + (tx << self.CAL_SHIFT) + half,
+            m10 * a + m11 * d, m10 * b + m11 * e, m10 * c + m11 * f + (ty << self.CAL_SHIFT) + half,
+        )
+
+    @staticmethod
+    def _det3(m):
+        return (m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1]) -
+                m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0]) +
+                m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0]))
@@ -1,3 +1,8 @@
 import extensions.framebuffer_extensions as fb
 import extensions.input_extensions as input
 import extensions.re_extensions as re
+import extensions.game_loop as loop
+import extensions.dirty_rects as dirty
+import extensions.entity_pool as pool
+import extensions.stroke as stroke
+import extensions.rle_sprite as rle
@@ -0,0 +1,61 @@
+# Tracks changed screen regions as a small set of merged rectangles.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+
+class DirtyRects(object):
+    """List of dirty rectangles (x, y, w, h) clipped to width x height.
+
+    Overlapping rectangles are merged into their bounding box, so every
+    pixel is only pushed once.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.rects = []
+
+    def __iter__(self):
+        return iter(self.rects)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def clear(self):
+        self.rects.clear()
+
+    def add(self, x, y, w, h):
+        """Add a rectangle, merging it with all rectangles it overlaps."""
+        x1 = max(x, 0)
+        y1 = max(y, 0)
+        x2 = min(x + w, self.width)
+        y2 = min(y + h, self.height)
+        if x1 >= x2 or y1 >= y2:
+            return
+        rects = self.rects
+        idx = 0
+        while idx < len(rects):
+            rx, ry, rw, rh = rects[idx]
+            if x1 <= rx + rw and rx <= x2 and y1 <= ry + rh and ry <= y2:
+                # merge and start over, the bigger rect might overlap others now
+                x1 = min(x1, rx)
+                y1 = min(y1, ry)
+                x2 = max(x2, rx + rw)
+                y2 = max(y2, ry + rh)
+                rects.pop(idx)
+                idx = 0
+            else:
+                idx += 1
+        rects.append((x1, y1, x2 - x1, y2 - y1))
+
+    def intersects(self, x, y, w, h):
+        """Return True if the given rectangle overlaps any dirty rectangle."""
+        for rx, ry, rw, rh in self.rects:
+            if x < rx + rw and rx < x + w and y < ry + rh and ry < y + h:
+                return True
+        return False
+
+    def area(self):
+        """Return the number of dirty pixels."""
+        return sum(rw * rh for _, _, rw, rh in self.rects)
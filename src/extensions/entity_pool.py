@@ -0,0 +1,68 @@
+# Fixed-capacity object pool for game entities.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+
+class EntityPool(object):
+    """Preallocated entities with O(1) acquire and release.
+
+    Active entities are kept at the front of the item list, releasing one
+    swaps it with the last active entity. Entities must provide a writable
+    pool_index attribute (add it to __slots__).
+
+    Iterate over the active entities by index, from back to front, so the
+    current entity may be released (no iterator is allocated):
+
+        items = pool.items
+        for idx in range(pool.count - 1, -1, -1):
+            item = items[idx]
+    """
+
+    def __init__(self, factory, capacity):
+        """Initialize entity pool.
+
+        Args:
+            factory (function): Creates one (inactive) entity
+            capacity (int): Max. number of active entities
+        """
+        self.items = []
+        for idx in range(capacity):
+            item = factory()
+            item.pool_index = idx
+            self.items.append(item)
+        self.capacity = capacity
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def acquire(self):
+        """Return an inactive entity and mark it active or None if the pool is exhausted."""
+        if self.count >= self.capacity:
+            return None
+        item = self.items[self.count]
+        self.count += 1
+        return item
+
+    def release(self, item):
+        """Mark an active entity inactive again."""
+        idx = item.pool_index
+        last = self.count - 1
+        if idx > last:
+            return  # not active
+        items = self.items
+        if idx != last:
+            other = items[last]
+            items[idx] = other
+            other.pool_index = idx
+            items[last] = item
+            item.pool_index = last
+        self.count = last
+
+    def is_active(self, item):
+        return item.pool_index < self.count
+
+    def clear(self):
+        """Release all entities."""
+        self.count = 0
@@ -356,8 +356,10 @@ class FrameBufferEx(object):
         for y, x in xdict.items():
             self.hline(x[0], y, x[1] - x[0] + 2, color)
 
-    def text(self, s, x, y, c=1, bg=-1, font=fonts.tt14):
-        """Draw some text."""
+    def text(self, s, x, y, c=1, bg=-1, font=None):
+        """Draw some text (font defaults to fonts.tt14)."""
+        if font is None:
+            font = fonts.tt14
         bg = bg if bg >= 0 else 1 if c == 0 else 0
         key = -1 if bg >= 0 else bg
         width = min(font.get_width(s), self.width)  # don't draw past width
@@ -0,0 +1,133 @@
+# Fixed timestep game loop with frame pacing and frame time telemetry.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+from utime import sleep_us, ticks_diff, ticks_ms, ticks_us
+
+
+class GameLoop(object):
+    """Runs update() at a fixed rate and draw()/flush() once per frame.
+
+    Frame times are smoothed with an integer moving average so the loop
+    doesn't allocate floats while running.
+    """
+
+    def __init__(self, update, draw, flush=None, step_ms=33, max_fps=None, max_steps=4,
+                 report_interval_ms=None, deadline=None):
+        """Initialize game loop.
+
+        Args:
+            update (function): Advances the game state by one timestep
+            draw (function): Renders the current state into the back buffer
+            flush (Optional function): Pushes the back buffer to the display
+            step_ms (Optional int): Length of one update timestep in ms (default 33)
+            max_fps (Optional int): Limit frames per second (default unlimited)
+            max_steps (Optional int): Max. updates per frame before time is dropped (default 4)
+            report_interval_ms (Optional int): Print telemetry every n ms (default never)
+            deadline (Optional function): Returns the us until the display starts its next
+                                          refresh or None (e.g. FlushScheduler.deadline_us)
+        """
+        self.update = update
+        self.draw = draw
+        self.flush = flush
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.min_frame_us = 1000000 // max_fps if max_fps else 0
+        self.report_interval_ms = report_interval_ms
+        self.deadline = deadline
+        self.running = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset telemetry."""
+        self.frames = 0
+        self.steps = 0
+        self.dropped_ms = 0
+        # last and smoothed (avg_*) timings in us
+        self.frame_us = self.avg_frame_us = 0
+        self.update_us = self.avg_update_us = 0
+        self.draw_us = self.avg_draw_us = 0
+        self.flush_us = self.avg_flush_us = 0
+        self.max_frame_us = 0
+        self.deadline_us = 0  # us left for draw and flush when the frame started drawing
+        self.missed_deadlines = 0  # frames flushed after the refresh started
+
+    @property
+    def fps(self):
+        """Smoothed frames per second."""
+        return 1000000 // self.avg_frame_us if self.avg_frame_us else 0
+
+    def run(self):
+        """Run until stop() is called."""
+        self.running = True
+        self._accumulator = 0
+        self._last_ms = self._report_ms = ticks_ms()
+        self._frame_start = ticks_us()
+        while self.running:
+            self.tick()
+
+    def stop(self):
+        self.running = False
+
+    def tick(self):
+        """Run one frame: all pending updates, then draw and flush."""
+        now = ticks_ms()
+        self._accumulator += ticks_diff(now, self._last_ms)
+        self._last_ms = now
+        # don't spiral when rendering can't keep up, drop the time instead
+        max_accumulator = self.step_ms * self.max_steps
+        if self._accumulator > max_accumulator:
+            self.dropped_ms += self._accumulator - max_accumulator
+            self._accumulator = max_accumulator
+
+        t0 = ticks_us()
+        while self._accumulator >= self.step_ms:
+            self.update()
+            self._accumulator -= self.step_ms
+            self.steps += 1
+        t1 = ticks_us()
+        if self.deadline:
+            self.deadline_us = self.deadline()
+        self.draw()
+        t2 = ticks_us()
+        if self.flush:
+            self.flush()
+        t3 = ticks_us()
+        if self.deadline and self.deadline_us is not None and ticks_diff(t3, t1) > self.deadline_us:
+            self.missed_deadlines += 1
+
+        # frame pacing
+        if self.min_frame_us:
+            remaining = self.min_frame_us - ticks_diff(t3, self._frame_start)
+            if remaining > 0:
+                sleep_us(remaining)
+        frame_end = ticks_us()
+
+        self.update_us = ticks_diff(t1, t0)
+        self.draw_us = ticks_diff(t2, t1)
+        self.flush_us = ticks_diff(t3, t2)
+        self.frame_us = ticks_diff(frame_end, self._frame_start)
+        self._frame_start = frame_end
+        self.max_frame_us = max(self.max_frame_us, self.frame_us)
+        if self.frames:
+            self.avg_update_us += (self.update_us - self.avg_update_us) >> 3
+            self.avg_draw_us += (self.draw_us - self.avg_draw_us) >> 3
+            self.avg_flush_us += (self.flush_us - self.avg_flush_us) >> 3
+            self.avg_frame_us += (self.frame_us - self.avg_frame_us) >> 3
+        else:
+            self.avg_update_us = self.update_us
+            self.avg_draw_us = self.draw_us
+            self.avg_flush_us = self.flush_us
+            self.avg_frame_us = self.frame_us
+        self.frames += 1
+
+        if self.report_interval_ms and ticks_diff(now, self._report_ms) >= self.report_interval_ms:
+            self._report_ms = now
+            print(self.report())
+
+    def report(self):
+        """Return telemetry as human readable string."""
+        return (f'fps={self.fps} frame={self.avg_frame_us}us (max {self.max_frame_us}us) '
+                f'update={self.avg_update_us}us draw={self.avg_draw_us}us flush={self.avg_flush_us}us '
+                f'dropped={self.dropped_ms}ms missed_deadlines={self.missed_deadlines}')
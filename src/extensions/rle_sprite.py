@@ -0,0 +1,108 @@
+# Run-length encoded RGB565 sprites (.rle, see tools/rle_encoder.py).
+#
+# Sprites stay compressed in RAM and are drawn run by run: solid runs as
+# hlines, literal runs as one span and transparent runs are skipped. Works
+# with Display and FrameBufferEx targets.
+#
+# File format: b'RLE1', width (uint16 LE), height (uint16 LE), then per row
+# runs that never cross the row end. Each run starts with a byte holding the
+# run type in bits 7-6 and the run length - 1 in bits 5-0:
+#   SKIP    - transparent pixels, no data
+#   FILL    - one color (2 bytes, big-endian) repeated
+#   LITERAL - length colors (2 bytes each, big-endian)
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import framebuf
+import ustruct
+
+MAGIC = b'RLE1'
+HEADER = '<4sHH'
+RUN_FILL = const(0x40)
+RUN_LITERAL = const(0x80)
+RUN_TYPE_MASK = const(0xC0)
+
+
+class RLESprite(object):
+    """Run-length encoded sprite."""
+
+    def __init__(self, filename=None, data=None):
+        """Initialize RLE sprite from a file or from the file contents.
+
+        Args:
+            filename (Optional str): .rle file path
+            data (Optional bytes): .rle file contents
+        """
+        if filename is not None:
+            with open(filename, 'rb') as file:
+                data = file.read()
+        data = bytearray(data)  # literal runs are blitted from it, framebuf needs a writable buffer
+        magic, self.width, self.height = ustruct.unpack_from(HEADER, data, 0)
+        if magic != MAGIC:
+            raise ValueError('not a RLE sprite')
+        self.data = memoryview(data)[ustruct.calcsize(HEADER):]
+
+    def draw(self, target, x, y, bg=None):
+        """Draw the sprite with its top left corner at x,y.
+
+        Args:
+            target: Display, FrameBufferEx or framebuf.FrameBuffer
+            x (int): Left coordinate
+            y (int): Top coordinate
+            bg (Optional int): Color of transparent pixels (default: leave them untouched)
+        """
+        dest = getattr(target, 'fbuf', target)
+        if isinstance(dest, framebuf.FrameBuffer):
+            # framebuffers hold the pixels in display byte order (see FrameBufferEx.text)
+            self._draw_framebuffer(dest, x, y, bg)
+        else:
+            self._draw_display(dest, x, y, bg)
+
+    def _draw_display(self, display, x, y, bg):
+        data = self.data
+        width = self.width
+        idx = 0
+        for row in range(y, y + self.height):
+            col = 0
+            while col < width:
+                run = data[idx]
+                count = (run & 0x3F) + 1
+                run_type = run & RUN_TYPE_MASK
+                if run_type == RUN_FILL:
+                    display.hline(x + col, row, count, data[idx + 1] << 8 | data[idx + 2])
+                    idx += 3
+                elif run_type == RUN_LITERAL:
+                    display.draw_chunk(data[idx + 1:idx + 1 + count * 2], x + col, row, x + col + count - 1, row)
+                    idx += 1 + count * 2
+                else:
+                    if bg is not None:
+                        display.hline(x + col, row, count, bg)
+                    idx += 1
+                col += count
+
+    def _draw_framebuffer(self, native, x, y, bg):
+        data = self.data
+        width = self.width
+        if bg is not None:
+            bg = (bg & 0xFF) << 8 | bg >> 8
+        idx = 0
+        for row in range(y, y + self.height):
+            col = 0
+            while col < width:
+                run = data[idx]
+                count = (run & 0x3F) + 1
+                run_type = run & RUN_TYPE_MASK
+                if run_type == RUN_FILL:
+                    native.hline(x + col, row, count, data[idx + 2] << 8 | data[idx + 1])
+                    idx += 3
+                elif run_type == RUN_LITERAL:
+                    # one blit per run, copies the pixels in display byte order
+                    span = framebuf.FrameBuffer(data[idx + 1:idx + 1 + count * 2], count, 1, framebuf.RGB565)
+                    native.blit(span, x + col, row)
+                    idx += 1 + count * 2
+                else:
+                    if bg is not None:
+                        native.hline(x + col, row, count, bg)
+                    idx += 1
+                col += count
@@ -0,0 +1,102 @@
+# Renders pen strokes as connected thick lines with round joins.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+from math import sqrt
+
+
+class StrokeRenderer(object):
+    """Draws a point stream (e.g. touch samples) as a continuous thick line.
+
+    Every segment is rasterized as one horizontal span per row (a line with
+    round caps is convex). The parts of a span that were already drawn by
+    the previous segment (mostly the shared round join) are skipped, so
+    consecutive segments don't paint the same pixels twice.
+    """
+
+    def __init__(self, fbuf, radius=4, color=0xFFFF):
+        """Initialize stroke renderer.
+
+        Args:
+            fbuf: Target with a hline(x, y, w, c) method (Display or FrameBufferEx)
+            radius (int): Half the line width in pixels
+            color (int): RGB565 color value
+        """
+        self.fbuf = fbuf
+        self.radius = radius
+        self.color = color
+        self.spans = 0  # number of drawn spans
+        self.pixels = 0  # number of drawn pixels
+        self._last = None  # last point of the stroke
+        self._last_spans = {}  # y: (x1, x2) of the last segment
+
+    def add(self, x, y):
+        """Extend the current stroke (or start a new one) to x,y."""
+        if self._last is None:
+            spans = self._segment_spans(x, y, x, y)
+        elif self._last == (x, y):
+            return
+        else:
+            spans = self._segment_spans(self._last[0], self._last[1], x, y)
+        last_spans = self._last_spans
+        for row, (x1, x2) in spans.items():
+            prev = last_spans.get(row)
+            if prev is None or x2 < prev[0] or x1 > prev[1]:
+                self._hline(x1, row, x2)
+                continue
+            # only draw what sticks out of the previous segment
+            if x1 < prev[0]:
+                self._hline(x1, row, prev[0] - 1)
+            if x2 > prev[1]:
+                self._hline(prev[1] + 1, row, x2)
+        self._last = (x, y)
+        self._last_spans = spans
+
+    def end(self):
+        """End the current stroke, the next point starts a new one."""
+        self._last = None
+        self._last_spans = {}
+
+    def _hline(self, x1, y, x2):
+        self.spans += 1
+        self.pixels += x2 - x1 + 1
+        self.fbuf.hline(x1, y, x2 - x1 + 1, self.color)
+
+    def _segment_spans(self, x0, y0, x1, y1):
+        """Return {y: (x1, x2)} of a line with round caps from x0,y0 to x1,y1."""
+        r = self.radius
+        r2 = r * r
+        dx = x1 - x0
+        dy = y1 - y0
+        length = sqrt(dx * dx + dy * dy)
+        spans = {}
+        for y in range(min(y0, y1) - r, max(y0, y1) + r + 1):
+            left = None
+            right = None
+            # round caps
+            for cx, cy in ((x0, y0), (x1, y1)):
+                ry = y - cy
+                if -r <= ry <= r:
+                    half = int(sqrt(r2 - ry * ry))
+                    if left is None or cx - half < left:
+                        left = cx - half
+                    if right is None or cx + half > right:
+                        right = cx + half
+            # body: row intersection with the rectangle around the line
+            if length and dy:
+                nx = -dy * r / length
+                ny = dx * r / length
+                corners = ((x0 + nx, y0 + ny), (x1 + nx, y1 + ny), (x1 - nx, y1 - ny), (x0 - nx, y0 - ny))
+                for idx in range(4):
+                    ax, ay = corners[idx]
+                    bx, by = corners[(idx + 1) % 4]
+                    if ay != by and min(ay, by) <= y <= max(ay, by):
+                        ix = ax + (y - ay) * (bx - ax) / (by - ay)
+                        if left is None or ix < left:
+                            left = int(ix + 0.5)
+                        if right is None or ix > right:
+                            right = int(ix + 0.5)
+            if left is not None:
+                spans[y] = (left, right)
+        return spans
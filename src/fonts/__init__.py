@@ -1,11 +1,15 @@
-from ucollections import OrderedDict
+from utils.lazy_registry import LazyRegistry
 
-import fonts.tt14
-import fonts.tt24
-import fonts.tt32
-
-FONTS = OrderedDict([
-    ['tt14', tt14],
-    ['tt24', tt24],
-    ['tt32', tt32]
+# fonts are imported on first use, FONTS.unload() frees them again
+FONTS = LazyRegistry([
+    ['tt14', 'fonts.tt14'],
+    ['tt24', 'fonts.tt24'],
+    ['tt32', 'fonts.tt32'],
 ])
+
+
+def __getattr__(name):
+    # lazy access via fonts.<name>
+    if name in FONTS:
+        return FONTS[name]
+    raise AttributeError(name)
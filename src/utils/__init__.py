@@ -1 +1,10 @@
-from utils.common_colors import COMMON_COLORS
+# common_colors imports the display driver, only load it when it is used
+# (importing utils.lazy_registry stays cheap)
+
+
+def __getattr__(name):
+    # lazy access via utils.COMMON_COLORS
+    if name == 'COMMON_COLORS':
+        from utils.common_colors import COMMON_COLORS
+        return COMMON_COLORS
+    raise AttributeError(name)
@@ -0,0 +1,65 @@
+import gc
+import sys
+
+
+def unload_modules(name):
+    """Remove module name and all its submodules from sys.modules to reclaim their RAM."""
+    for key in list(sys.modules.keys()):
+        if key != name and not key.startswith(name + '.'):
+            continue
+        del sys.modules[key]
+        parent, _, child = key.rpartition('.')
+        if parent in sys.modules:
+            try:
+                delattr(sys.modules[parent], child)
+            except AttributeError:
+                pass
+    gc.collect()
+
+
+class LazyRegistry(object):
+    """Ordered name -> module registry, modules are imported on first access.
+
+    Args:
+        modules (list): [name, module path] pairs
+    """
+
+    def __init__(self, modules):
+        self.names = [name for name, _ in modules]
+        self.paths = dict(modules)
+
+    def __getitem__(self, name):
+        path = self.paths[name]
+        module = sys.modules.get(path)
+        if module is None:
+            __import__(path)
+            module = sys.modules[path]
+        return module
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def keys(self):
+        return list(self.names)
+
+    def values(self):
+        """Return all modules (imports the ones not loaded yet)."""
+        return [self[name] for name in self.names]
+
+    def items(self):
+        """Return all [name, module] pairs (imports the ones not loaded yet)."""
+        return [(name, self[name]) for name in self.names]
+
+    def is_loaded(self, name):
+        return self.paths[name] in sys.modules
+
+    def unload(self, name=None):
+        """Unload the module of name (or all modules if name is None)."""
+        for key in self.names if name is None else [name]:
+            unload_modules(self.paths[key])
@@ -0,0 +1,32 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Runs the diagnostics benchmark against the host simulator (see sim/).
+#
+# The timings reflect CPython, not the device, the transferred bytes are the
+# same as on the device though.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import argparse
+
+import sim
+
+DESC = """Runs the diagnostics benchmark on the simulated ILI9341 and prints the results as CSV.
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('outfile', type=str, nargs='?', default=None, help='Optional CSV output file path')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per workload')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per workload')
+    args = parser.parse_args()
+
+    display, panel = sim.create_display()
+    from diagnostics.benchmark import Benchmark
+
+    benchmark = Benchmark(display, warmup=args.warmup, repeat=args.repeat)
+    benchmark.run(0, filename=args.outfile)
@@ -0,0 +1,81 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Precompiles the micropython sources to .mpy files with mpy-cross.
+#
+# Importing .mpy files skips the compile step on the device, which shortens
+# the time from boot to the first frame and lowers the peak heap use.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+DESC = """Compiles all .py files of the source tree to .mpy (mpy-cross must be installed,
+e.g. "pip install mpy-cross"), other files are copied. The entry point stays a .py file.
+Upload the output directory instead of src.
+"""
+
+KEEP_SOURCE = ('demo.py', 'main.py', 'boot.py')  # entry points must stay .py
+
+
+def find_mpy_cross(path=None):
+    """Return the mpy-cross command."""
+    if path:
+        return [path]
+    if shutil.which('mpy-cross'):
+        return ['mpy-cross']
+    try:
+        import mpy_cross  # noqa: F401
+    except ImportError:
+        print('mpy-cross not found, install it with "pip install mpy-cross" or pass --mpy-cross')
+        sys.exit(1)
+    return [sys.executable, '-m', 'mpy_cross']
+
+
+def build(srcdir, outdir, mpy_cross, options):
+    """Compile srcdir to outdir, return (source bytes, output bytes)."""
+    src_size = 0
+    out_size = 0
+    for root, dirs, files in os.walk(srcdir):
+        dirs[:] = [d for d in dirs if d != '__pycache__' and not d.startswith('.')]
+        rel_root = os.path.relpath(root, srcdir)
+        os.makedirs(os.path.join(outdir, rel_root), exist_ok=True)
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            src = os.path.join(root, name)
+            rel = os.path.normpath(os.path.join(rel_root, name))
+            if name.endswith('.py') and rel not in KEEP_SOURCE:
+                dst = os.path.join(outdir, rel[:-3] + '.mpy')
+                # -s sets the source name shown in tracebacks
+                subprocess.run(mpy_cross + options + ['-s', rel, '-o', dst, src], check=True)
+                src_size += os.path.getsize(src)
+                out_size += os.path.getsize(dst)
+            else:
+                shutil.copyfile(src, os.path.join(outdir, rel))
+    return src_size, out_size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('srcdir', type=str, nargs='?', default='src', help='Source directory (default: src)')
+    parser.add_argument('outdir', type=str, nargs='?', default='build', help='Output directory (default: build)')
+    parser.add_argument('--mpy-cross', type=str, default=None, help='Path of the mpy-cross executable')
+    parser.add_argument('--march', type=str, default='armv6m',
+                        help='Native code architecture (default: armv6m for the rp2040)')
+    parser.add_argument('-O', type=int, default=None, dest='opt', help='Optimization level passed to mpy-cross')
+    args = parser.parse_args()
+
+    options = [f'-march={args.march}']
+    if args.opt is not None:
+        options.append(f'-O{args.opt}')
+    if os.path.exists(args.outdir):
+        shutil.rmtree(args.outdir)
+    src_size, out_size = build(args.srcdir, args.outdir, find_mpy_cross(args.mpy_cross), options)
+    print(f'{args.outdir}: compiled {src_size} bytes of source to {out_size} bytes of .mpy')
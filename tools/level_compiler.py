@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Compiles pico-spacegame level files (enemies.dat) into the binary,
+# time-sorted spawn table read by apps/pico_spacegame/level.py.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import argparse
+import struct
+import sys
+
+# Must match apps/pico_spacegame/level.py
+MAGIC = b'SGL1'
+HEADER = '<4sHI'  # magic, number of records, level end in ms
+RECORD = '<IBhhb'  # start time in ms, radius, start x, start y, velocity
+NO_END = 0xFFFFFFFF
+
+# Asteroid radius for each size name
+SIZES = {
+    'asteroid_sml': 5,
+    'asteroid_med': 8,
+    'asteroid_lge': 12,
+}
+
+DESC = """level_compiler.py
+Compile a pico-spacegame level file into the binary spawn table format.
+
+Input lines are: <start seconds>,asteroid,<size>,<x>,<y>,<velocity> and
+<end seconds>,end
+"""
+
+
+def parse(lines):
+    """Return (records, level_end_ms) of a level file."""
+    records = []
+    level_end = NO_END
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        details = line.split(',')
+        try:
+            start_ms = int(details[0]) * 1000
+            if details[1] == 'end':
+                level_end = start_ms
+            elif details[1] == 'asteroid':
+                size = SIZES.get(details[2], SIZES['asteroid_lge'])
+                records.append((start_ms, size, int(details[3]), int(details[4]), int(details[5])))
+            else:
+                raise ValueError(f'unknown enemy type "{details[1]}"')
+        except (IndexError, ValueError) as e:
+            raise ValueError(f'line {line_no}: {e}') from None
+    # stable sort, entries with equal start times keep their file order
+    records.sort(key=lambda record: record[0])
+    return records, level_end
+
+
+def compile_level(lines):
+    """Return the binary level for the given level file lines."""
+    records, level_end = parse(lines)
+    data = bytearray(struct.pack(HEADER, MAGIC, len(records), level_end))
+    for record in records:
+        data += struct.pack(RECORD, *record)
+    return bytes(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('infile', type=str, help='Input file path (e.g. enemies.dat)')
+    parser.add_argument('outfile', type=str, help='Output file path (e.g. enemies.lvl)')
+    args = parser.parse_args()
+
+    try:
+        with open(args.infile, 'r') as file:
+            data = compile_level(file.readlines())
+    except ValueError as e:
+        print(f'Error in {args.infile}: {e}')
+        sys.exit(1)
+    with open(args.outfile, 'wb') as file:
+        file.write(data)
+    print(f'{args.outfile}: {(len(data) - struct.calcsize(HEADER)) // struct.calcsize(RECORD)} records, '
+          f'{len(data)} bytes')
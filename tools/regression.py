@@ -0,0 +1,125 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Golden-image and byte-budget regression harness for the display driver.
+#
+# Renders the diagnostics scenes on the host simulator (see sim/) and compares
+# the visible panel content against stored hashes. SPI bytes and transactions
+# per scene must not exceed the recorded budgets.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import sim
+
+DESC = """Renders the diagnostics scenes on the simulated ILI9341 and checks them against
+golden image hashes and SPI byte/transaction budgets.
+
+Run with --update to record new golden values after an intended change.
+"""
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'regression.json')
+
+
+def get_scenes(display):
+    """Return the scenes to render as [name, func]."""
+    import diagnostics.draw_test
+    from diagnostics.draw_test import DrawTest
+    from diagnostics.font_test import FontTest
+    from fonts import FONTS
+    from utils import COMMON_COLORS
+
+    diagnostics.draw_test.sleep = lambda seconds: None  # scenes pause between steps
+    bg_color = COMMON_COLORS[0]
+    draw_test = DrawTest(display)
+    font_test = FontTest(display)
+
+    def font_scene(font, func):
+        def render():
+            font_test.font = font
+            func(bg_color)
+        return render
+
+    scenes = [
+        ['rectangles', lambda: draw_test.test_rectangles(bg_color)],
+        ['circles', lambda: draw_test.test_circles(bg_color)],
+        ['polygons', lambda: draw_test.test_polygons(bg_color)],
+        ['blit', lambda: draw_test.test_blit(bg_color)],
+        ['scroll', lambda: draw_test.test_scroll(bg_color)],
+    ]
+    for name, font in FONTS.items():
+        scenes.append([f'font_{name}', font_scene(font, font_test.test_normal)])
+        scenes.append([f'font_{name}_background', font_scene(font, font_test.test_background)])
+    return scenes
+
+
+def render_scenes(dump_dir=None):
+    """Render all scenes and return {name: {'hash', 'bytes', 'transactions'}}."""
+    display, panel = sim.create_display()
+    results = {}
+    for name, render in get_scenes(display):
+        display.scroll_abs(0, 0)
+        panel.gram[:] = bytes(len(panel.gram))
+        panel.reset_stats()
+        render()
+        results[name] = {
+            'hash': hashlib.sha1(panel.visible()).hexdigest(),
+            'bytes': panel.command_bytes + panel.data_bytes,
+            'transactions': panel.transactions,
+        }
+        if dump_dir:
+            panel.to_ppm(os.path.join(dump_dir, f'{name}.ppm'))
+    return results
+
+
+def check(results, golden):
+    """Compare results with golden values, return the list of failures."""
+    failures = []
+    for name, result in results.items():
+        expected = golden.get(name)
+        if expected is None:
+            failures.append(f'{name}: no golden values recorded')
+            continue
+        if result['hash'] != expected['hash']:
+            failures.append(f'{name}: image changed ({result["hash"]} != {expected["hash"]})')
+        for key in ('bytes', 'transactions'):
+            if result[key] > expected[key]:
+                failures.append(f'{name}: {key} over budget ({result[key]} > {expected[key]})')
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--golden', type=str, default=GOLDEN_FILE, help='Golden values file path')
+    parser.add_argument('--update', action='store_true', help='Record the current results as golden values')
+    parser.add_argument('--dump', type=str, default=None, help='Directory to dump the scene images (PPM) to')
+    args = parser.parse_args()
+
+    if args.dump:
+        os.makedirs(args.dump, exist_ok=True)
+    results = render_scenes(args.dump)
+    for name, result in results.items():
+        print(f'{name:<24} {result["bytes"]:>8} bytes {result["transactions"]:>6} transactions  {result["hash"]}')
+
+    if args.update:
+        with open(args.golden, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f'golden values written to {args.golden}')
+        sys.exit(0)
+
+    with open(args.golden, 'r') as file:
+        golden = json.load(file)
+    failures = check(results, golden)
+    for failure in failures:
+        print(f'FAIL {failure}')
+    if failures:
+        sys.exit(1)
+    print(f'all {len(results)} scenes passed')
@@ -0,0 +1,105 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Encodes RGB565 sprites (.spr or raw big-endian) into the run-length
+# encoded format drawn by extensions/rle_sprite.py.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import argparse
+import struct
+import sys
+
+DESC = """Encodes a .spr sprite (width byte, height byte, RGB565 big-endian pixels) or a raw
+RGB565 image (--width required) into a .rle sprite. Pixels of the key color become
+transparent runs (default 0x0000, black like the transparency of Actor).
+
+Example:
+python3 rle_encoder.py spacecraftimg.spr spacecraftimg.rle
+"""
+
+MAGIC = b'RLE1'
+HEADER = '<4sHH'
+RUN_SKIP = 0x00
+RUN_FILL = 0x40
+RUN_LITERAL = 0x80
+MAX_RUN = 64
+
+
+def encode_row(row, key):
+    """Return the runs of one row of colors."""
+    out = bytearray()
+    literal = []
+
+    def flush_literal():
+        while literal:
+            chunk = literal[:MAX_RUN]
+            del literal[:MAX_RUN]
+            out.append(RUN_LITERAL | (len(chunk) - 1))
+            for color in chunk:
+                out.extend(struct.pack('>H', color))
+
+    idx = 0
+    while idx < len(row):
+        color = row[idx]
+        end = idx
+        while end < len(row) and row[end] == color and end - idx < MAX_RUN:
+            end += 1
+        count = end - idx
+        if color == key:
+            flush_literal()
+            out.append(RUN_SKIP | (count - 1))
+        elif count >= 2:
+            # a fill run costs 3 bytes, the same pixels as literal 2 bytes each
+            flush_literal()
+            out.append(RUN_FILL | (count - 1))
+            out.extend(struct.pack('>H', color))
+        else:
+            literal.append(color)
+        idx = end
+    flush_literal()
+    return bytes(out)
+
+
+def encode(pixels, width, height, key):
+    """Return the .rle file contents of width*height big-endian RGB565 pixels."""
+    colors = struct.unpack(f'>{width * height}H', pixels[:width * height * 2])
+    data = bytearray(struct.pack(HEADER, MAGIC, width, height))
+    for y in range(height):
+        data.extend(encode_row(colors[y * width:(y + 1) * width], key))
+    return bytes(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('infile', type=str, help='Input file path (.spr or raw RGB565)')
+    parser.add_argument('outfile', type=str, help='Output file path (.rle)')
+    parser.add_argument('--width', type=int, default=None, help='Image width of raw input files')
+    parser.add_argument('--key', type=lambda value: int(value, 0), default=0x0000,
+                        help='Transparent color (default 0x0000)')
+    parser.add_argument('--no-key', action='store_true', help='Encode without transparency')
+    args = parser.parse_args()
+
+    with open(args.infile, 'rb') as file:
+        data = file.read()
+    if args.infile.endswith('.spr'):
+        width, height = data[0], data[1]
+        pixels = data[2:]
+    elif args.width:
+        width = args.width
+        height = len(data) // (width * 2)
+        pixels = data
+    else:
+        print('--width is required for raw input files')
+        sys.exit(1)
+    if len(pixels) < width * height * 2:
+        print(f'Error in {args.infile}: expected {width * height * 2} bytes of pixels, got {len(pixels)}')
+        sys.exit(1)
+
+    encoded = encode(pixels, width, height, None if args.no_key else args.key)
+    with open(args.outfile, 'wb') as file:
+        file.write(encoded)
+    print(f'{args.outfile}: {width}x{height}, {width * height * 2} -> {len(encoded)} bytes '
+          f'({len(encoded) * 100 // (width * height * 2)}%)')
@@ -0,0 +1,119 @@
+# Host simulator for the micropython drivers.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import array
+import asyncio
+import binascii
+import builtins
+import collections
+import os
+import struct
+import sys
+import time
+import types
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src')
+
+_installed = False
+
+
+def _utime():
+    module = types.ModuleType('utime')
+    for name in ('time', 'sleep', 'localtime', 'mktime', 'gmtime'):
+        setattr(module, name, getattr(time, name))
+    module.ticks_ms = lambda: int(time.perf_counter() * 1000) & 0x3FFFFFFF
+    module.ticks_us = lambda: int(time.perf_counter() * 1000000) & 0x3FFFFFFF
+    module.ticks_cpu = module.ticks_us
+    module.ticks_add = lambda ticks, delta: (ticks + delta) & 0x3FFFFFFF
+    module.ticks_diff = lambda a, b: ((a - b + 0x20000000) & 0x3FFFFFFF) - 0x20000000
+    module.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    module.sleep_us = lambda us: time.sleep(us / 1000000)
+    return module
+
+
+def _micropython():
+    module = types.ModuleType('micropython')
+    module.const = lambda value: value
+    module.schedule = lambda func, arg: func(arg)
+    module.alloc_emergency_exception_buf = lambda size: None
+    module.native = module.viper = module.bytecode = lambda func: func
+    module.mem_info = lambda *args: None
+    module.opt_level = lambda *args: 0
+    return module
+
+
+def _uasyncio():
+    module = types.ModuleType('uasyncio')
+    module.__dict__.update({k: v for k, v in vars(asyncio).items() if not k.startswith('__')})
+
+    async def sleep_ms(ms):
+        await asyncio.sleep(ms / 1000)
+
+    module.sleep_ms = sleep_ms
+    return module
+
+
+def install():
+    """Register the stand-in modules and put the driver sources on sys.path."""
+    global _installed
+    if _installed:
+        return
+    from sim import framebuf, machine
+
+    utime = _utime()
+    micropython = _micropython()
+    sys.modules.update({
+        'machine': machine,
+        'framebuf': framebuf,
+        'micropython': micropython,
+        'utime': utime,
+        'ustruct': struct,
+        'ubinascii': binascii,
+        'ucollections': collections,
+        'uarray': array,
+        'uasyncio': _uasyncio(),
+    })
+    builtins.const = micropython.const
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    _installed = True
+
+
+def create_display(rotation=0, baudrate=51200000, **kwargs):
+    """Create a drivers.Display connected to a simulated panel.
+
+    Returns:
+        (Display, ILI9341): The driver instance and the panel model.
+    """
+    install()
+    from drivers import Display
+    from machine import PWM, SPI, Pin
+    from sim.ili9341 import ILI9341
+
+    spi = SPI(1, baudrate=baudrate)
+    cs = Pin(13)
+    dc = Pin(14)
+    panel = spi.attach(ILI9341(cs, dc))
+    display = Display(spi, PWM(Pin(15)), cs=cs, dc=dc, rotation=rotation, **kwargs)
+    return display, panel
+
+
+def create_touch(spi=None, **kwargs):
+    """Create a drivers.Touch connected to a simulated touch controller.
+
+    Returns:
+        (Touch, XPT2046): The driver instance and the controller model.
+    """
+    install()
+    from drivers import Touch
+    from machine import SPI, Pin
+    from sim.xpt2046 import XPT2046
+
+    spi = spi or SPI(0, baudrate=1000000)
+    cs = Pin(9)
+    int_pin = Pin(8)
+    controller = spi.attach(XPT2046(cs, int_pin))
+    touch = Touch(spi, cs=cs, int_pin=int_pin, **kwargs)
+    return touch, controller
@@ -0,0 +1,36 @@
+# Draws a test pattern with the display driver on the simulated panel and
+# dumps the panel content to an image.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import argparse
+
+import sim
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser('python3 -m sim', description='Render a test pattern on the simulated ILI9341.')
+    parser.add_argument('outfile', type=str, nargs='?', default='sim.ppm', help='Output image path (PPM)')
+    parser.add_argument('-r', '--rotation', type=int, default=0, choices=(0, 90, 180, 270), help='Display rotation')
+    args = parser.parse_args()
+
+    if args.rotation in (90, 270):
+        display, panel = sim.create_display(rotation=args.rotation, width=320, height=240)
+    else:
+        display, panel = sim.create_display(rotation=args.rotation)
+    from drivers import color565
+    from extensions import fb
+
+    panel.reset_stats()
+    fbuf = fb.FrameBufferEx(None, display.width, display.height, fbuf=display)
+    fbuf.fill(color565(0, 0, 64))
+    fbuf.fill_rect(10, 10, 40, 40, color565(255, 0, 0))
+    fbuf.fill_rect(60, 10, 40, 40, color565(0, 255, 0))
+    fbuf.fill_rect(110, 10, 40, 40, color565(0, 0, 255))
+    fbuf.line(0, 0, display.width - 1, display.height - 1, color565(255, 255, 0))
+    fbuf.fill_circle(display.width // 2, display.height // 2, 30, color565(0, 255, 255))
+    fbuf.text('pico-go', 10, 60, color565(255, 255, 255))
+    panel.to_ppm(args.outfile)
+    print(f'{args.outfile}: {panel.transactions} transactions, {panel.command_bytes} command bytes, '
+          f'{panel.data_bytes} data bytes, {panel.pixels_written} pixels')
@@ -0,0 +1,129 @@
+# CPython stand-in for the micropython framebuf module.
+#
+# Only the RGB565 and GS8 formats are implemented, pixels are stored in the
+# same (little-endian) byte order as the native module.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+RGB565 = 1
+GS2_HMSB = 5
+GS4_HMSB = 2
+GS8 = 6
+MVLSB = MONO_VLSB
+
+
+class FrameBuffer(object):
+    """Pure python implementation of framebuf.FrameBuffer."""
+
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format not in (RGB565, GS8):
+            raise NotImplementedError(f'Format {format} not supported by simulator.')
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        self.format = format
+        self.stride = width if stride is None else stride
+        self._bpp = 2 if format == RGB565 else 1
+
+    def _get(self, x, y):
+        idx = (y * self.stride + x) * self._bpp
+        if self._bpp == 2:
+            return self.buffer[idx] | (self.buffer[idx + 1] << 8)
+        return self.buffer[idx]
+
+    def _set(self, x, y, c):
+        idx = (y * self.stride + x) * self._bpp
+        if self._bpp == 2:
+            self.buffer[idx] = c & 0xFF
+            self.buffer[idx + 1] = (c >> 8) & 0xFF
+        else:
+            self.buffer[idx] = c & 0xFF
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self.width, self.height, c)
+
+    def pixel(self, x, y, c=None):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            if c is None:
+                return self._get(x, y)
+            self._set(x, y, c)
+        return None
+
+    def fill_rect(self, x, y, w, h, c):
+        x1 = max(x, 0)
+        y1 = max(y, 0)
+        x2 = min(x + w, self.width)
+        y2 = min(y + h, self.height)
+        if x1 >= x2 or y1 >= y2:
+            return
+        if self._bpp == 2:
+            row = bytes((c & 0xFF, (c >> 8) & 0xFF)) * (x2 - x1)
+        else:
+            row = bytes((c & 0xFF,)) * (x2 - x1)
+        for yy in range(y1, y2):
+            idx = (yy * self.stride + x1) * self._bpp
+            self.buffer[idx:idx + len(row)] = row
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self.fill_rect(x, y, 1, h, c)
+        self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        dx = abs(x2 - x1)
+        sx = 1 if x1 < x2 else -1
+        dy = -abs(y2 - y1)
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if palette is not None and not isinstance(palette, FrameBuffer):
+            palette = None
+        for yy in range(max(0, -y), min(fbuf.height, self.height - y)):
+            for xx in range(max(0, -x), min(fbuf.width, self.width - x)):
+                c = fbuf._get(xx, yy)
+                if palette is not None:
+                    c = palette._get(c, 0)
+                if c != key:
+                    self._set(x + xx, y + yy, c)
+
+    def scroll(self, xstep, ystep):
+        src = FrameBuffer(bytearray(self.buffer), self.width, self.height, self.format, self.stride)
+        for yy in range(self.height):
+            for xx in range(self.width):
+                sx = xx - xstep
+                sy = yy - ystep
+                if 0 <= sx < self.width and 0 <= sy < self.height:
+                    self._set(xx, yy, src._get(sx, sy))
+
+    def text(self, s, x, y, c=1):
+        raise NotImplementedError('FrameBuffer.text not supported by simulator.')
+
+
+def FrameBuffer1(*args, **kwargs):
+    return FrameBuffer(*args, **kwargs)
@@ -0,0 +1,255 @@
+# Simulated ILI9341 panel that decodes the SPI command stream into GRAM.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+import struct
+import time
+
+WIDTH = 240
+HEIGHT = 320
+
+
+class ILI9341(object):
+    """ILI9341 GRAM model attached to a simulated SPI bus.
+
+    Args:
+        cs (Class Pin):  Chip select pin of the panel
+        dc (Class Pin):  Data/Command pin of the panel
+    """
+
+    SWRESET = 0x01
+    RDDID = 0x04
+    RDDST = 0x09
+    RDMODE = 0x0A
+    RDMADCTL = 0x0B
+    RDPIXFMT = 0x0C
+    SLPIN = 0x10
+    SLPOUT = 0x11
+    PTLON = 0x12
+    NORON = 0x13
+    DISPLAY_OFF = 0x28
+    DISPLAY_ON = 0x29
+    SET_COLUMN = 0x2A
+    SET_PAGE = 0x2B
+    WRITE_RAM = 0x2C
+    PTLAR = 0x30
+    VSCRDEF = 0x33
+    MADCTL = 0x36
+    VSCRSADD = 0x37
+    IDMOFF = 0x38
+    IDMON = 0x39
+    PIXFMT = 0x3A
+    WRITE_RAM_CONT = 0x3C
+    GET_SCANLINE = 0x45
+    FRMCTR1 = 0xB1
+    FRMCTR2 = 0xB2
+    FRMCTR3 = 0xB3
+
+    def __init__(self, cs, dc):
+        self.cs = cs
+        self.dc = dc
+        self.gram = bytearray(WIDTH * HEIGHT * 2)
+        self.reset_stats()
+        self.reset()
+
+    def reset(self):
+        """Reset register state (GRAM content is retained like on the real panel)."""
+        self.madctl = 0x00
+        self.pixfmt = 0x66
+        self.sleeping = True
+        self.display_on = False
+        self.partial = False
+        self.idle = False
+        self.ptlar = (0, HEIGHT - 1)
+        self.vscrdef = (0, HEIGHT, 0)
+        self.vscrsadd = 0
+        self.frmctr = {self.FRMCTR1: (0x00, 0x1B), self.FRMCTR2: (0x00, 0x1B), self.FRMCTR3: (0x00, 0x1B)}
+        self.col = (0, WIDTH - 1)
+        self.page = (0, HEIGHT - 1)
+        self._command = None
+        self._params = bytearray()
+        self._cursor = None
+        self._epoch = time.perf_counter()
+
+    def reset_stats(self):
+        """Reset the traffic counters."""
+        self.transactions = 0
+        self.command_bytes = 0
+        self.data_bytes = 0
+        self.pixels_written = 0
+
+    # SPI device interface
+
+    def transfer(self, data, read_buf, baudrate):
+        self.transactions += 1
+        if not self.dc.value():
+            self.command_bytes += 1
+            self._begin(data[0])
+            if read_buf is not None:
+                self._respond(data[0], read_buf)
+            data = data[1:]
+            if not data:
+                return
+            if read_buf is not None:
+                return
+        self.data_bytes += len(data)
+        self._data(data)
+
+    # command decoding
+
+    def _begin(self, command):
+        self._command = command
+        self._params = bytearray()
+        self._cursor = None
+        if command == self.SWRESET:
+            self.reset()
+        elif command == self.SLPIN:
+            self.sleeping = True
+        elif command == self.SLPOUT:
+            self.sleeping = False
+        elif command == self.DISPLAY_ON:
+            self.display_on = True
+        elif command == self.DISPLAY_OFF:
+            self.display_on = False
+        elif command == self.PTLON:
+            self.partial = True
+        elif command == self.NORON:
+            self.partial = False
+        elif command == self.IDMON:
+            self.idle = True
+        elif command == self.IDMOFF:
+            self.idle = False
+        elif command == self.WRITE_RAM:
+            self._cursor = [self.col[0], self.page[0]]
+        elif command == self.WRITE_RAM_CONT:
+            self._cursor = self._cursor or [self.col[0], self.page[0]]
+
+    def _data(self, data):
+        command = self._command
+        if command in (self.WRITE_RAM, self.WRITE_RAM_CONT):
+            self._write_pixels(data)
+            return
+        self._params += data
+        params = self._params
+        if command == self.SET_COLUMN and len(params) >= 4:
+            self.col = struct.unpack('>HH', params[:4])
+        elif command == self.SET_PAGE and len(params) >= 4:
+            self.page = struct.unpack('>HH', params[:4])
+        elif command == self.MADCTL and len(params) >= 1:
+            self.madctl = params[0]
+        elif command == self.PIXFMT and len(params) >= 1:
+            self.pixfmt = params[0]
+        elif command == self.VSCRDEF and len(params) >= 6:
+            self.vscrdef = struct.unpack('>HHH', params[:6])
+        elif command == self.VSCRSADD and len(params) >= 2:
+            self.vscrsadd = struct.unpack('>H', params[:2])[0]
+        elif command == self.PTLAR and len(params) >= 4:
+            self.ptlar = struct.unpack('>HH', params[:4])
+        elif command in self.frmctr and len(params) >= 2:
+            self.frmctr[command] = (params[0], params[1])
+
+    def _respond(self, command, read_buf):
+        if command == self.RDMADCTL:
+            response = bytes([self.madctl])
+        elif command == self.RDPIXFMT:
+            response = bytes([self.pixfmt])
+        elif command == self.RDMODE:
+            # D7 booster on, D6 idle, D5 partial, D4 sleep out, D3 normal mode, D2 display on
+            response = bytes([0x80 | (0x40 if self.idle else 0) | (0x20 if self.partial else 0x08) |
+                              (0x10 if not self.sleeping else 0) | (0x04 if self.display_on else 0)])
+        elif command == self.RDDID:
+            response = bytes([0x00, 0x93, 0x41])
+        elif command == self.RDDST:
+            response = bytes([self.madctl, self.pixfmt, 0x00, 0x00])
+        elif command == self.GET_SCANLINE:
+            response = struct.pack('>H', self.scanline())
+        else:
+            response = b''
+        # the panel clocks out one dummy bit after the command byte
+        num_bytes = len(read_buf) - 1
+        bits = int.from_bytes((response + bytes(num_bytes))[:num_bytes], 'big') >> 1
+        read_buf[1:] = bits.to_bytes(num_bytes, 'big')
+
+    def _map(self, col, page):
+        # ROTATE[0] of the driver (MX|BGR) is the natural orientation of the module
+        if self.madctl & 0x20:  # MV
+            x, y = page, col
+        else:
+            x, y = col, page
+        if not self.madctl & 0x40:  # MX
+            x = WIDTH - 1 - x
+        if self.madctl & 0x80:  # MY
+            y = HEIGHT - 1 - y
+        return x, y
+
+    def _write_pixels(self, data):
+        if self._cursor is None:
+            return
+        col, page = self._cursor
+        x1, x2 = self.col
+        y2 = self.page[1]
+        gram = self.gram
+        for idx in range(0, len(data) - 1, 2):
+            if page > y2:
+                break
+            x, y = self._map(col, page)
+            if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+                pos = (y * WIDTH + x) * 2
+                gram[pos] = data[idx]
+                gram[pos + 1] = data[idx + 1]
+            self.pixels_written += 1
+            col += 1
+            if col > x2:
+                col = x1
+                page += 1
+        self._cursor = [col, page]
+
+    # inspection helpers
+
+    def frame_rate(self):
+        """Return the frame rate in Hz configured for the current display mode."""
+        if self.idle:
+            diva, rtna = self.frmctr[self.FRMCTR2]
+        elif self.partial:
+            diva, rtna = self.frmctr[self.FRMCTR3]
+        else:
+            diva, rtna = self.frmctr[self.FRMCTR1]
+        return 615000 / (max(rtna & 0x1F, 0x10) * (HEIGHT + 4) * (1 << (diva & 0x03)))
+
+    def scanline(self):
+        """Return the scanline the simulated panel is currently refreshing."""
+        lines = HEIGHT + 4
+        elapsed = time.perf_counter() - self._epoch
+        return int(elapsed * self.frame_rate() * lines) % lines
+
+    def get_pixel(self, x, y):
+        """Return the RGB565 value stored in GRAM at physical coordinates."""
+        pos = (y * WIDTH + x) * 2
+        return (self.gram[pos] << 8) | self.gram[pos + 1]
+
+    def visible(self):
+        """Return GRAM as it is scanned out, applying the vertical scroll."""
+        top, middle, bottom = self.vscrdef
+        out = bytearray(len(self.gram))
+        row = WIDTH * 2
+        for y in range(HEIGHT):
+            src = y
+            if top <= y < top + middle and middle:
+                src = top + (y - top + self.vscrsadd - top) % middle
+            out[y * row:(y + 1) * row] = self.gram[src * row:(src + 1) * row]
+        return out
+
+    def to_ppm(self, path, visible=True):
+        """Dump the panel content to a binary PPM image."""
+        data = self.visible() if visible else self.gram
+        rgb = bytearray(WIDTH * HEIGHT * 3)
+        for idx in range(WIDTH * HEIGHT):
+            c = (data[idx * 2] << 8) | data[idx * 2 + 1]
+            r, g, b = (c >> 11) & 0x1F, (c >> 5) & 0x3F, c & 0x1F
+            rgb[idx * 3] = (r << 3) | (r >> 2)
+            rgb[idx * 3 + 1] = (g << 2) | (g >> 4)
+            rgb[idx * 3 + 2] = (b << 3) | (b >> 2)
+        with open(path, 'wb') as file:
+            file.write(b'P6\n%d %d\n255\n' % (WIDTH, HEIGHT))
+            file.write(rgb)
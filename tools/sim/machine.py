@@ -0,0 +1,141 @@
+# CPython stand-ins for machine.Pin, machine.SPI and machine.PWM.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+
+class Pin(object):
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id=None, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self._value = 0 if value is None else value
+        self._irq_handler = None
+        self._irq_trigger = 0
+
+    def init(self, mode=-1, pull=-1, value=None, **kwargs):
+        self.mode = mode
+        self.pull = pull
+        if value is not None:
+            self._value = value
+        elif pull == self.PULL_UP:
+            self._value = 1
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._set(value)
+        return None
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def on(self):
+        self._set(1)
+
+    def off(self):
+        self._set(0)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, **kwargs):
+        self._irq_handler = handler
+        self._irq_trigger = trigger
+
+    def _set(self, value):
+        old = self._value
+        self._value = 1 if value else 0
+        if self._irq_handler is not None:
+            if (old and not self._value and self._irq_trigger & self.IRQ_FALLING) or \
+                    (not old and self._value and self._irq_trigger & self.IRQ_RISING):
+                self._irq_handler(self)
+
+    def drive(self, value):
+        """Drive the pin from the outside (e.g. a simulated touch controller)."""
+        self._set(value)
+
+
+class SPI(object):
+    """SPI bus that forwards all transfers to the attached simulated devices.
+
+    A device is selected when its chip select pin is low.
+    """
+
+    def __init__(self, id=0, baudrate=1000000, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self.devices = []
+        self.active = True
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate is not None:
+            self.baudrate = baudrate
+        self.active = True
+
+    def deinit(self):
+        self.active = False
+
+    def attach(self, device):
+        self.devices.append(device)
+        return device
+
+    def _selected(self):
+        return [dev for dev in self.devices if not dev.cs.value()]
+
+    def write(self, buf):
+        for dev in self._selected():
+            dev.transfer(bytes(buf), None, self.baudrate)
+
+    def read(self, nbytes, write=0x00):
+        buf = bytearray(nbytes)
+        self.readinto(buf, write)
+        return bytes(buf)
+
+    def readinto(self, buf, write=0x00):
+        self.write_readinto(bytes([write]) * len(buf), buf)
+
+    def write_readinto(self, write_buf, read_buf):
+        out = bytes(write_buf)
+        for idx in range(len(read_buf)):
+            read_buf[idx] = 0
+        for dev in self._selected():
+            dev.transfer(out, read_buf, self.baudrate)
+
+
+class PWM(object):
+
+    def __init__(self, pin, freq=None, duty_u16=None):
+        self.pin = pin
+        self._freq = freq or 0
+        self._duty = duty_u16 or 0
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = value
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
+
+    def deinit(self):
+        self._duty = 0
+
+
+def freq(value=None):
+    return 125000000
+
+
+def reset():
+    raise SystemExit('machine.reset()')
+
+
+def soft_reset():
+    raise SystemExit('machine.soft_reset()')
@@ -0,0 +1,59 @@
+# Simulated XPT2046 touch controller.
+#
+# MIT License; Copyright (c) 2022 Christopher Hubmann
+#
+
+
+class XPT2046(object):
+    """XPT2046 model attached to a simulated SPI bus.
+
+    Args:
+        cs (Class Pin):  Chip select pin of the controller
+        int_pin (Optional Class Pin):  PENIRQ pin, driven low while touched
+    """
+
+    def __init__(self, cs, int_pin=None):
+        self.cs = cs
+        self.int_pin = int_pin
+        self.transactions = 0
+        self.x = 0
+        self.y = 0
+        self.z1 = 0
+        self.z2 = 4095
+        self.pressed = False
+
+    def press(self, x, y, z1=600, z2=1800):
+        """Touch the panel at the given raw 12-bit ADC coordinates."""
+        self.x, self.y, self.z1, self.z2 = x, y, z1, z2
+        was_pressed = self.pressed
+        self.pressed = True
+        if self.int_pin is not None and not was_pressed:
+            self.int_pin.drive(0)
+
+    def release(self):
+        """Lift the pen."""
+        self.pressed = False
+        self.z1 = 0
+        self.z2 = 4095
+        if self.int_pin is not None:
+            self.int_pin.drive(1)
+
+    def _convert(self, command):
+        channel = (command >> 4) & 0x07
+        if not self.pressed:
+            return {5: 0, 1: 4095, 3: 0, 4: 4095}.get(channel, 0)
+        return {5: self.x, 1: self.y, 3: self.z1, 4: self.z2}.get(channel, 0)
+
+    def transfer(self, data, read_buf, baudrate):
+        self.transactions += 1
+        if read_buf is None:
+            return
+        # every byte with the start bit set starts a conversion, the 12-bit
+        # result is clocked out MSB first after one busy bit
+        for idx, byte in enumerate(data):
+            if byte & 0x80:
+                value = self._convert(byte) << 3
+                if idx + 1 < len(read_buf):
+                    read_buf[idx + 1] |= (value >> 8) & 0xFF
+                if idx + 2 < len(read_buf):
+                    read_buf[idx + 2] |= value & 0xFF